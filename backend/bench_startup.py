@@ -0,0 +1,69 @@
+"""
+Cold-start benchmark for the API
+
+Starts uvicorn in a fresh process several times and measures how long it takes
+until the `/` health check answers, plus how long `import main` takes on its own.
+
+Usage:
+    python bench_startup.py [--runs 5] [--port 8765]
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def time_import() -> float:
+    """Seconds for a fresh interpreter to import the app module"""
+    code = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def time_first_health_check(port: int, timeout: float = 60.0) -> float:
+    """Seconds from process start until GET / returns 200"""
+    env = dict(os.environ, PYTHONUNBUFFERED="1")
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=env
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1) as resp:
+                    if resp.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.01)
+        raise TimeoutError(f"No health response within {timeout}s")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure API cold-start time")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=0, help="Port to use (default: pick a free one)")
+    args = parser.parse_args()
+    
+    imports = [time_import() for _ in range(args.runs)]
+    health = [time_first_health_check(args.port or free_port()) for _ in range(args.runs)]
+    
+    print(f"import main        median {statistics.median(imports) * 1000:8.1f} ms   max {max(imports) * 1000:8.1f} ms")
+    print(f"first GET / (200)  median {statistics.median(health) * 1000:8.1f} ms   max {max(health) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
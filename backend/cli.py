@@ -0,0 +1,156 @@
+"""
+Headless catalog generation
+
+Examples:
+    python cli.py --type full
+    python cli.py --source export.csv --type category --each --jobs 4 --output-dir output/nightly
+    python cli.py --type author --select "Agatha Christie" --select "Isaac Asimov"
+    python cli.py --spec-file nightly.json --jobs 8
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+from dotenv import load_dotenv
+
+from services.sheets_service import SheetsService
+from services.pdf_service import PDFService, BATCH_RENDER_WORKERS
+from services.archive_service import safe_filename
+
+load_dotenv()
+
+CATALOG_TYPES = ["category", "author", "full"]
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate PDF catalogs without the HTTP API")
+    parser.add_argument("--source", default="sheet",
+                        help="'sheet' for the configured Google Sheet, or a local .csv/.tsv/.json export")
+    parser.add_argument("--type", dest="catalog_type", choices=CATALOG_TYPES, default="category",
+                        help="Catalog type (default: category)")
+    parser.add_argument("--select", action="append", default=[], metavar="ITEM",
+                        help="Category or author to include; repeat for several")
+    parser.add_argument("--each", action="store_true",
+                        help="One catalog per selected item (or per every category/author when none selected)")
+    parser.add_argument("--spec-file",
+                        help="JSON list of {catalog_type, selected_items, name} specs; overrides --type/--select")
+    parser.add_argument("--output-dir", default="output", help="Where PDFs are written (default: output)")
+    parser.add_argument("--jobs", type=int, default=BATCH_RENDER_WORKERS,
+                        help=f"Catalogs rendered in parallel, one process each (default: {BATCH_RENDER_WORKERS})")
+    parser.add_argument("--quiet", action="store_true", help="Only print the final summary")
+    return parser.parse_args(argv)
+
+
+def build_specs(args: argparse.Namespace, sheets_service: SheetsService, data: List[List[str]]) -> List[Dict[str, Any]]:
+    """Turn command-line options into a list of catalog specs"""
+    if args.spec_file:
+        with open(args.spec_file, encoding="utf-8") as f:
+            specs = json.load(f)
+        for spec in specs:
+            if spec.get("catalog_type") not in CATALOG_TYPES:
+                raise SystemExit(f"Invalid catalog_type in spec: {spec}")
+        return specs
+    
+    if args.catalog_type == "full":
+        return [{"catalog_type": "full", "selected_items": None}]
+    
+    items = args.select
+    if args.each:
+        if not items:
+            if args.catalog_type == "category":
+                items = [c["name"] for c in sheets_service.extract_categories(data)]
+            else:
+                items = [a["name"] for a in sheets_service.extract_authors(data)]
+        return [{"catalog_type": args.catalog_type, "selected_items": [item]} for item in items]
+    
+    if not items:
+        raise SystemExit(f"--select is required for {args.catalog_type} catalogs (or use --each)")
+    return [{"catalog_type": args.catalog_type, "selected_items": items}]
+
+
+async def run(args: argparse.Namespace) -> int:
+    timings: Dict[str, float] = {}
+    started = time.perf_counter()
+    
+    # 1. LOAD
+    stage_start = time.perf_counter()
+    sheets_service = SheetsService()
+    if args.source == "sheet":
+        data = await sheets_service.get_sheet_data()
+    else:
+        data = sheets_service.get_file_data(args.source)
+    timings["load"] = time.perf_counter() - stage_start
+    if len(data) < 2:
+        print("No rows found in source", file=sys.stderr)
+        return 1
+    
+    # 2. INDEX & FILTER
+    stage_start = time.perf_counter()
+    index = sheets_service.build_index(data)
+    specs = build_specs(args, sheets_service, data)
+    stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    os.makedirs(args.output_dir, exist_ok=True)
+    
+    jobs = []
+    for idx, spec in enumerate(specs, 1):
+        catalog_type = spec["catalog_type"]
+        selected_items = spec.get("selected_items")
+        if catalog_type == "full":
+            filtered_data = data
+        elif not selected_items:
+            raise SystemExit(f"Spec {idx}: no {catalog_type} items selected")
+        else:
+            kind = "categories" if catalog_type == "category" else "authors"
+            filtered_data = sheets_service.filter_by_index(data, index, kind, selected_items)
+        
+        label = spec.get("name") or (selected_items[0] if selected_items else "full")
+        # Spec index keeps names unique where labels sanitize alike (O'Brien vs O Brien)
+        jobs.append({
+            "data": filtered_data,
+            "output_path": os.path.join(args.output_dir, f"catalog_{idx:03d}_{catalog_type}_{safe_filename(label)}_{stamp}.pdf"),
+            "catalog_type": catalog_type,
+            "selected_items": selected_items,
+        })
+    timings["index"] = time.perf_counter() - stage_start
+    
+    # 3. PREFETCH & RENDER
+    def progress_callback(progress: int, message: str):
+        if not args.quiet:
+            print(f"[{progress:3d}%] {message}")
+    
+    results = await PDFService().generate_batch(
+        jobs,
+        progress_callback=progress_callback,
+        max_workers=args.jobs,
+        timings=timings
+    )
+    timings["total"] = time.perf_counter() - started
+    
+    # 4. REPORT
+    print(f"\nRows: {len(data) - 1}  Catalogs: {len(jobs)}  Jobs: {args.jobs}")
+    for stage in ["load", "index", "prefetch", "render", "total"]:
+        if stage in timings:
+            print(f"  {stage:<9}{timings[stage]:8.2f}s")
+    failed = 0
+    for result in results:
+        if result["error"]:
+            failed += 1
+            print(f"  FAILED  {result['output_path']}: {result['error']}")
+        else:
+            print(f"  {result['seconds']:7.2f}s {result['output_path']}")
+    
+    return 1 if failed else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
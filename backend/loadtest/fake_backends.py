@@ -0,0 +1,134 @@
+"""
+Local stand-ins for the API's external dependencies
+
+- A generated sheet export (CSV) that SheetsService reads via SHEET_DATA_FILE
+- An HTTP image server for cover URLs, with optional latency and 429 throttling
+
+Only the standard library is used, so the load test runs without network access.
+"""
+import csv
+import random
+import struct
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple
+
+
+# Same column order SheetsService/PDFService read (price at 2, image URL at 3)
+HEADER = ["Code", "Description", "Price", "Image", "Author", "Category"]
+
+MAIN_CATEGORIES = ["Fiction", "Non-Fiction", "Children", "Science", "Computers",
+                   "Cooking", "Arts", "History", "Travel", "Education"]
+SUB_CATEGORIES = ["Classic", "Modern", "Reference", "Illustrated"]
+
+
+def author_name(i: int) -> str:
+    return f"Author {i:05d}"
+
+
+def write_dataset(path: str, products: int, authors: int, image_base_url: str, seed: int = 1) -> None:
+    """Write a sheet-shaped CSV with products spread over categories and authors"""
+    rng = random.Random(seed)
+    categories = [f"{m} > {s}" for m in MAIN_CATEGORIES for s in SUB_CATEGORIES] + MAIN_CATEGORIES
+    author_names = [author_name(i) for i in range(authors)]
+
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        for i in range(products):
+            cats = rng.sample(categories, k=rng.choice([1, 1, 1, 2]))
+            writer.writerow([
+                f"978{i:010d}",
+                f"Sample Title {i}",
+                f"{rng.randint(5, 150) * 100}",
+                f"{image_base_url}/img/{i % 5000}.png",
+                rng.choice(author_names),
+                ", ".join(cats),
+            ])
+
+
+def _png(width: int, height: int, seed: int) -> bytes:
+    """Small noisy RGB PNG so covers differ in content and size"""
+    rng = random.Random(seed)
+    base = (rng.randrange(256), rng.randrange(256), rng.randrange(256))
+    rows = []
+    for _ in range(height):
+        row = bytearray(b"\x00")
+        for _ in range(width):
+            row += bytes((c + rng.randrange(32)) % 256 for c in base)
+        rows.append(bytes(row))
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    return (b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(b"".join(rows), 6))
+            + chunk(b"IEND", b""))
+
+
+class ImageServer:
+    """
+    Threaded HTTP server answering /img/<n>.png
+
+    Args:
+        latency_ms: Delay added to every response
+        throttle_rate: Fraction of requests answered with 429
+        variants: Distinct images generated up front and served round-robin
+    """
+
+    def __init__(self, latency_ms: float = 0, throttle_rate: float = 0, variants: int = 32):
+        self.latency = latency_ms / 1000
+        self.throttle_rate = throttle_rate
+        self.images = [_png(120, 160, seed) for seed in range(variants)]
+        self.requests = 0
+        self.throttled = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> Tuple[str, int]:
+        server_ref = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with server_ref._lock:
+                    server_ref.requests += 1
+                    throttle = random.random() < server_ref.throttle_rate
+                    if throttle:
+                        server_ref.throttled += 1
+                if server_ref.latency:
+                    time.sleep(server_ref.latency)
+                if throttle:
+                    self.send_response(429)
+                    self.send_header("Retry-After", "1")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                try:
+                    n = int(self.path.rsplit("/", 1)[-1].split(".")[0])
+                except ValueError:
+                    self.send_error(404)
+                    return
+                body = server_ref.images[n % len(server_ref.images)]
+                self.send_response(200)
+                self.send_header("Content-Type", "image/png")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self._server.server_address[0], self._server.server_address[1]
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
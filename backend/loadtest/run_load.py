@@ -0,0 +1,379 @@
+"""
+Load test for the API against local stand-ins (no network needed)
+
+Starts a local image server, writes a generated sheet export, launches the app
+under uvicorn pointed at both, and runs concurrent virtual users. Each user
+repeatedly picks a scenario:
+
+    data      GET /api/data (revalidating with If-None-Match)
+    search    GET /api/data/authors?q=...&match=prefix
+    generate  POST /api/catalog/generate, follow /api/catalog/stream (SSE) to the end,
+              then download the PDF
+    poll      GET /api/catalog/progress for a recently started task
+
+Reports p50/p95/p99 latency and throughput per scenario, event-loop lag (latency
+of the trivial `/` endpoint, probed every 100 ms) and server RSS over time.
+
+Usage (from backend/):
+    python -m loadtest.run_load --users 50 --duration 60
+    python -m loadtest.run_load --users 20 --mix data=5,search=3,generate=1,poll=1 --json report.json
+"""
+import argparse
+import json
+import math
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from typing import Dict, List, Optional, Tuple
+
+from loadtest.fake_backends import ImageServer, author_name, write_dataset, MAIN_CATEGORIES, SUB_CATEGORIES
+
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class Recorder:
+    """Thread-safe store of (scenario, latency, ok) samples"""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.lock = threading.Lock()
+        self.task_ids: List[str] = []
+
+    def record(self, name: str, seconds: float, ok: bool = True):
+        with self.lock:
+            self.samples.setdefault(name, []).append(seconds)
+            if not ok:
+                self.errors[name] = self.errors.get(name, 0) + 1
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def request(method: str, url: str, body: Optional[dict] = None,
+            headers: Optional[Dict[str, str]] = None, timeout: float = 120) -> Tuple[int, bytes, Dict[str, str]]:
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    req = urllib.request.Request(url, data=data, method=method, headers=dict(headers or {}))
+    if data is not None:
+        req.add_header("Content-Type", "application/json")
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            return resp.status, resp.read(), dict(resp.headers)
+    except urllib.error.HTTPError as e:
+        return e.code, e.read(), dict(e.headers)
+
+
+def timed(recorder: Recorder, name: str, fn, *args, **kwargs):
+    started = time.perf_counter()
+    try:
+        status, body, headers = fn(*args, **kwargs)
+        ok = status < 400
+    except Exception:
+        status, body, headers, ok = 0, b"", {}, False
+    recorder.record(name, time.perf_counter() - started, ok)
+    return status, body, headers
+
+
+# --- Scenarios -------------------------------------------------------------
+
+def scenario_data(base: str, recorder: Recorder, rng: random.Random, state: dict):
+    headers = {"Accept-Encoding": "gzip"}
+    if state.get("etag"):
+        headers["If-None-Match"] = state["etag"]
+    status, _, resp_headers = timed(recorder, "data", request, "GET", f"{base}/api/data", headers=headers)
+    if status == 200:
+        state["etag"] = resp_headers.get("ETag") or resp_headers.get("etag")
+
+
+def scenario_search(base: str, recorder: Recorder, rng: random.Random, state: dict):
+    # Drop the last digit so each query is a prefix shared by up to ten generated names
+    q = author_name(rng.randrange(state["authors"]))[:-1]
+    timed(recorder, "search", request, "GET",
+          f"{base}/api/data/authors?q={urllib.parse.quote(q)}&match=prefix&limit=50",
+          headers={"Accept-Encoding": "gzip"})
+
+
+def scenario_generate(base: str, recorder: Recorder, rng: random.Random, state: dict):
+    category = f"{rng.choice(MAIN_CATEGORIES)} > {rng.choice(SUB_CATEGORIES)}"
+    status, body, _ = timed(recorder, "generate", request, "POST", f"{base}/api/catalog/generate",
+                            body={"catalog_type": "category", "selected_items": [category]})
+    if status != 200:
+        return
+    started = time.perf_counter()
+    result = json.loads(body)
+    with recorder.lock:
+        recorder.task_ids.append(result["task_id"])
+
+    # Follow the SSE stream until the job finishes
+    final_status = None
+    first_event = None
+    try:
+        with urllib.request.urlopen(f"{base}/api/catalog/stream/{result['task_id']}", timeout=900) as resp:
+            for raw in resp:
+                line = raw.decode("utf-8").strip()
+                if not line.startswith("data:"):
+                    continue
+                if first_event is None:
+                    first_event = time.perf_counter() - started
+                    recorder.record("stream_first_event", first_event)
+                event = json.loads(line[5:])
+                if event.get("status") in ("complete", "error"):
+                    final_status = event["status"]
+                    break
+    except Exception:
+        final_status = "error"
+    recorder.record("catalog_end_to_end", time.perf_counter() - started, final_status == "complete")
+
+    if final_status == "complete":
+        timed(recorder, "download", request, "GET", f"{base}/api/catalog/download/{result['filename']}")
+
+
+def scenario_poll(base: str, recorder: Recorder, rng: random.Random, state: dict):
+    with recorder.lock:
+        task_id = rng.choice(recorder.task_ids) if recorder.task_ids else None
+    if task_id:
+        timed(recorder, "poll", request, "GET", f"{base}/api/catalog/progress/{task_id}")
+
+
+SCENARIOS = {
+    "data": scenario_data,
+    "search": scenario_search,
+    "generate": scenario_generate,
+    "poll": scenario_poll,
+}
+
+
+def virtual_user(user_id: int, base: str, recorder: Recorder, mix: Dict[str, float],
+                 deadline: float, think_time: float, authors: int):
+    rng = random.Random(user_id)
+    names = list(mix)
+    weights = [mix[n] for n in names]
+    state: dict = {"authors": authors}
+    while time.monotonic() < deadline:
+        SCENARIOS[rng.choices(names, weights)[0]](base, recorder, rng, state)
+        time.sleep(rng.uniform(0, 2 * think_time))
+
+
+# --- Server-side probes ----------------------------------------------------
+
+def probe_loop_lag(base: str, stop: threading.Event, lags: List[float]):
+    """Latency of the trivial health endpoint approximates event-loop lag"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            request("GET", f"{base}/", timeout=30)
+            lags.append(time.perf_counter() - started)
+        except Exception:
+            pass
+        stop.wait(0.1)
+
+
+def rss_mb(pid: int) -> Optional[float]:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        out = subprocess.run(["ps", "-o", "rss=", "-p", str(pid)], capture_output=True, text=True)
+        return int(out.stdout.strip()) / 1024
+    except (ValueError, OSError):
+        return None
+
+
+def sample_memory(pid: int, stop: threading.Event, started: float, series: List[Tuple[float, float]]):
+    while not stop.is_set():
+        value = rss_mb(pid)
+        if value is not None:
+            series.append((time.monotonic() - started, value))
+        stop.wait(1.0)
+
+
+# --- Orchestration ---------------------------------------------------------
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_app(workdir: str, dataset: str, port: int, extra_env: Dict[str, str]) -> subprocess.Popen:
+    env = dict(os.environ, SHEET_DATA_FILE=dataset, PYTHONUNBUFFERED="1", **extra_env)
+    log = open(os.path.join(workdir, "server.log"), "w")
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--app-dir", BACKEND_DIR,
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"Server exited early; see {log.name}")
+        try:
+            request("GET", f"http://127.0.0.1:{port}/", timeout=1)
+            return proc
+        except OSError:
+            time.sleep(0.1)
+    proc.terminate()
+    raise RuntimeError("Server did not become healthy within 60s")
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario '{name}'; choose from {', '.join(SCENARIOS)}")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def build_report(recorder: Recorder, lags: List[float], memory: List[Tuple[float, float]],
+                 duration: float, image_server: ImageServer) -> dict:
+    scenarios = {}
+    for name, values in sorted(recorder.samples.items()):
+        scenarios[name] = {
+            "count": len(values),
+            "errors": recorder.errors.get(name, 0),
+            "throughput_per_s": round(len(values) / duration, 2),
+            "p50_ms": round(percentile(values, 50) * 1000, 1),
+            "p95_ms": round(percentile(values, 95) * 1000, 1),
+            "p99_ms": round(percentile(values, 99) * 1000, 1),
+            "max_ms": round(max(values) * 1000, 1),
+        }
+    return {
+        "duration_s": round(duration, 1),
+        "scenarios": scenarios,
+        "event_loop_lag_ms": {
+            "samples": len(lags),
+            "p50": round(percentile(lags, 50) * 1000, 1),
+            "p95": round(percentile(lags, 95) * 1000, 1),
+            "p99": round(percentile(lags, 99) * 1000, 1),
+            "max": round(max(lags) * 1000, 1) if lags else 0.0,
+        },
+        "server_rss_mb": {
+            "start": round(memory[0][1], 1) if memory else None,
+            "peak": round(max(v for _, v in memory), 1) if memory else None,
+            "end": round(memory[-1][1], 1) if memory else None,
+            "mean": round(statistics.mean(v for _, v in memory), 1) if memory else None,
+            "timeline": [(round(t, 1), round(v, 1)) for t, v in memory],
+        },
+        "image_server": {"requests": image_server.requests, "throttled": image_server.throttled},
+    }
+
+
+def print_report(report: dict):
+    print(f"\nDuration: {report['duration_s']}s")
+    print(f"{'scenario':<22}{'count':>7}{'errors':>8}{'req/s':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, s in report["scenarios"].items():
+        print(f"{name:<22}{s['count']:>7}{s['errors']:>8}{s['throughput_per_s']:>8}"
+              f"{s['p50_ms']:>10}{s['p95_ms']:>10}{s['p99_ms']:>10}")
+    lag = report["event_loop_lag_ms"]
+    print(f"\nEvent-loop lag (GET /): p50 {lag['p50']} ms  p95 {lag['p95']} ms  p99 {lag['p99']} ms  max {lag['max']} ms")
+    mem = report["server_rss_mb"]
+    print(f"Server RSS: start {mem['start']} MB  peak {mem['peak']} MB  end {mem['end']} MB")
+    timeline = mem["timeline"]
+    if timeline:
+        step = max(1, len(timeline) // 10)
+        print("  " + "  ".join(f"{t:.0f}s:{v:.0f}MB" for t, v in timeline[::step]))
+    img = report["image_server"]
+    print(f"Image server: {img['requests']} requests, {img['throttled']} throttled")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the API against local fake backends")
+    parser.add_argument("--users", type=int, default=50, help="Concurrent virtual users (default: 50)")
+    parser.add_argument("--duration", type=float, default=60, help="Seconds to generate load (default: 60)")
+    parser.add_argument("--ramp", type=float, default=5, help="Seconds over which users start (default: 5)")
+    parser.add_argument("--mix", default="data=4,search=3,generate=1,poll=2",
+                        help="Scenario weights (default: data=4,search=3,generate=1,poll=2)")
+    parser.add_argument("--think-time", type=float, default=0.5, help="Mean pause between actions in seconds")
+    parser.add_argument("--products", type=int, default=5000, help="Rows in the generated sheet")
+    parser.add_argument("--authors", type=int, default=2000, help="Distinct authors in the generated sheet")
+    parser.add_argument("--image-latency-ms", type=float, default=20, help="Latency added by the image server")
+    parser.add_argument("--image-429-rate", type=float, default=0.0, help="Fraction of image requests throttled")
+    parser.add_argument("--server-env", action="append", default=[], metavar="KEY=VALUE",
+                        help="Extra environment for the app, e.g. JOB_MAX_SECONDS=120")
+    parser.add_argument("--json", dest="json_path", help="Also write the report as JSON")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    random.seed(args.seed)
+    workdir = tempfile.mkdtemp(prefix="pdf_loadtest_")
+    print(f"Working directory: {workdir}")
+
+    image_server = ImageServer(latency_ms=args.image_latency_ms, throttle_rate=args.image_429_rate)
+    host, image_port = image_server.start()
+    dataset = os.path.join(workdir, "sheet.csv")
+    write_dataset(dataset, args.products, args.authors, f"http://{host}:{image_port}", seed=args.seed)
+
+    port = free_port()
+    extra_env = dict(item.split("=", 1) for item in args.server_env)
+    server = start_app(workdir, dataset, port, extra_env)
+    base = f"http://127.0.0.1:{port}"
+    print(f"App on {base}, images on http://{host}:{image_port}, {args.users} users for {args.duration:.0f}s")
+
+    recorder = Recorder()
+    stop = threading.Event()
+    lags: List[float] = []
+    memory: List[Tuple[float, float]] = []
+    started = time.monotonic()
+    probes = [
+        threading.Thread(target=probe_loop_lag, args=(base, stop, lags), daemon=True),
+        threading.Thread(target=sample_memory, args=(server.pid, stop, started, memory), daemon=True),
+    ]
+    for t in probes:
+        t.start()
+
+    deadline = started + args.ramp + args.duration
+    users = []
+    try:
+        for user_id in range(args.users):
+            t = threading.Thread(target=virtual_user, daemon=True,
+                                 args=(user_id, base, recorder, mix, deadline, args.think_time,
+                                       args.authors))
+            t.start()
+            users.append(t)
+            time.sleep(args.ramp / max(1, args.users))
+        for t in users:
+            t.join()
+    except KeyboardInterrupt:
+        print("Interrupted; reporting partial results")
+    finally:
+        duration = time.monotonic() - started
+        stop.set()
+        for t in probes:
+            t.join(timeout=5)
+        server.terminate()
+        server.wait(timeout=30)
+        image_server.stop()
+
+    report = build_report(recorder, lags, memory, duration, image_server)
+    print_report(report)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
@@ -6,12 +6,19 @@ from typing import List, Optional, Dict, Any
 import os
 from dotenv import load_dotenv
 import asyncio
+import hashlib
+import threading
+import time
 from datetime import datetime
 import json
+from contextlib import asynccontextmanager
 
-from services.sheets_service import SheetsService
-from services.pdf_service import PDFService
-from models.catalog_request import CatalogRequest, CatalogType
+from services.archive_service import stream_zip, safe_filename
+from services.budget_service import JobBudget
+from services.delivery_service import (
+    parse_range_header, iter_file_range, file_size, RangeNotSatisfiable, cached_json_response
+)
+from models.catalog_request import CatalogRequest, CatalogType, BatchCatalogRequest
 
 # Custom exception for cancellation
 class CancelledTask(Exception):
@@ -20,10 +27,28 @@ class CancelledTask(Exception):
 # Load environment variables
 load_dotenv()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm services in the background after startup, without delaying the first health check"""
+    if os.getenv("WARM_UP_ON_STARTUP", "true").lower() in ("1", "true", "yes"):
+        async def run_warm_up():
+            try:
+                timings = await asyncio.to_thread(warm_up_services)
+                print(f"Services warmed up: {timings}")
+            except Exception as e:
+                print(f"Warm-up failed (services will initialize on first use): {e}")
+        warm_up_task = asyncio.create_task(run_warm_up())
+        background_jobs.add(warm_up_task)
+        warm_up_task.add_done_callback(background_jobs.discard)
+    yield
+
+
 app = FastAPI(
     title="PDF Catalog Generator API",
     description="Generate professional PDF catalogs from Google Sheets data",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -45,13 +70,65 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize services
-sheets_service = SheetsService()
-pdf_service = PDFService()
+# Services are created on first use so the process can answer health checks
+# before googleapiclient/ReportLab are imported and the Sheets client is built
+_services: Dict[str, Any] = {}
+_services_lock = threading.Lock()
+
+
+def get_sheets_service():
+    """Shared SheetsService, created on first use"""
+    if "sheets" not in _services:
+        with _services_lock:
+            if "sheets" not in _services:
+                from services.sheets_service import SheetsService
+                _services["sheets"] = SheetsService()
+    return _services["sheets"]
+
+
+def get_pdf_service():
+    """Shared PDFService, created on first use to load ReportLab/PIL.
+
+    Jobs render on their own PDFService, which holds per-job state.
+    """
+    if "pdf" not in _services:
+        with _services_lock:
+            if "pdf" not in _services:
+                from services.pdf_service import PDFService
+                _services["pdf"] = PDFService()
+    return _services["pdf"]
+
+
+def warm_up_services() -> Dict[str, float]:
+    """Import and initialize all services, returning seconds spent per service"""
+    timings = {}
+    started = time.perf_counter()
+    get_sheets_service().warm_up()
+    timings["sheets"] = round(time.perf_counter() - started, 3)
+    started = time.perf_counter()
+    get_pdf_service()
+    timings["pdf"] = round(time.perf_counter() - started, 3)
+    started = time.perf_counter()
+    from services.image_resolvers import get_resolver_chain
+    get_resolver_chain().refresh()
+    timings["image_index"] = round(time.perf_counter() - started, 3)
+    return timings
+
 
 # Store for progress tracking and cancellation
 progress_store: Dict[str, Dict[str, Any]] = {}
 cancellation_tokens: Dict[str, bool] = {}
+profile_paths: Dict[str, str] = {}
+preview_artifacts: Dict[str, Dict[str, Any]] = {}
+background_jobs: set = set()  # Strong references to fire-and-forget asyncio tasks
+
+
+def task_record(task_id: str) -> Dict[str, Any]:
+    """Progress record for a task, including its preview artifact if one was requested"""
+    record = progress_store[task_id]
+    if task_id in preview_artifacts:
+        record = {**record, "preview": preview_artifacts[task_id]}
+    return record
 
 
 @app.get("/")
@@ -65,31 +142,83 @@ async def root():
     }
 
 
+@app.post("/api/warmup")
+async def warm_up():
+    """Initialize services now; platforms can call this after scaling up"""
+    timings = await asyncio.to_thread(warm_up_services)
+    return {"success": True, "timings": timings}
+
+
 @app.get("/api/data")
-async def get_sheet_data():
+async def get_sheet_data(request: Request, refresh: bool = False):
     """
     Fetch all data from Google Sheets
     Returns categories, authors, and product counts
+    Cached per data version; supports ETag/If-None-Match and gzip
     """
     try:
-        data = await sheets_service.get_sheet_data()
+        # Only the author and category columns are fetched, streamed in chunks
+        selector = await get_sheets_service().get_selector_index(refresh=refresh)
         
-        # Extract unique categories and authors
-        categories = sheets_service.extract_categories(data)
-        authors = sheets_service.extract_authors(data)
+        return cached_json_response(
+            request,
+            {"success": True, "data": selector.data},
+            etag=f'W/"{selector.version}"'
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def search_selector(request: Request, kind: str, q: str, match: str, offset: int, limit: int):
+    """Shared handler for the paginated author/category search endpoints"""
+    try:
+        selector = await get_sheets_service().get_selector_index()
+        index = selector.categories if kind == "categories" else selector.authors
+        items, total = index.search(q, match=match, offset=offset, limit=limit)
         
-        return {
-            "success": True,
-            "data": {
-                "categories": categories,
-                "authors": authors,
-                "total_products": len(data) - 1  # Exclude header
-            }
-        }
+        query_key = hashlib.sha1(f"{kind}|{q}|{match}|{offset}|{limit}".encode("utf-8")).hexdigest()[:8]
+        return cached_json_response(
+            request,
+            {
+                "success": True,
+                "data": {
+                    "items": items,
+                    "total": total,
+                    "offset": offset,
+                    "limit": limit,
+                    "version": selector.version
+                }
+            },
+            etag=f'W/"{selector.version}-{query_key}"'
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/data/categories")
+async def search_categories(
+    request: Request,
+    q: str = "",
+    match: str = Query("substring", pattern="^(prefix|substring)$"),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500)
+):
+    """Paginated category search (case-insensitive prefix or substring match)"""
+    return await search_selector(request, "categories", q, match, offset, limit)
+
+
+@app.get("/api/data/authors")
+async def search_authors(
+    request: Request,
+    q: str = "",
+    match: str = Query("substring", pattern="^(prefix|substring)$"),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500)
+):
+    """Paginated author search (case-insensitive prefix or substring match)"""
+    return await search_selector(request, "authors", q, match, offset, limit)
+
+
 @app.post("/api/catalog/generate")
 async def generate_catalog(request: CatalogRequest, background_tasks: BackgroundTasks):
     """
@@ -122,22 +251,45 @@ async def generate_catalog(request: CatalogRequest, background_tasks: Background
         else:
             filename = f"catalog_full_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
 
+        async def run_preview(filtered_data):
+            """Render the quick preview in its own thread and service so it finishes ahead of the full build"""
+            from services.pdf_service import PDFService, PREVIEW_PAGES_PER_SECTION
+            preview_filename = f"preview_{filename}"
+            preview_artifacts[task_id] = {"status": "generating", "filename": preview_filename}
+            
+            def render():
+                asyncio.run(PDFService().generate_catalog(
+                    filtered_data,
+                    os.path.join("output", preview_filename),
+                    catalog_type=request.catalog_type.value,
+                    selected_items=request.selected_items,
+                    check_cancel=check_cancel,
+                    preview_pages=PREVIEW_PAGES_PER_SECTION
+                ))
+            
+            try:
+                await asyncio.to_thread(render)
+                preview_artifacts[task_id] = {"status": "complete", "filename": preview_filename}
+                print(f"[{task_id}] Preview ready: {preview_filename}")
+            except Exception as e:
+                print(f"[{task_id}] Preview error: {e}")
+                preview_artifacts[task_id] = {"status": "error", "message": str(e)}
+        
         async def run_generation():
             try:
-                # Get sheet data
-                data = await sheets_service.get_sheet_data()
+                sheets_service = get_sheets_service()
                 
-                # Filter data based on request type
+                # Get sheet data, filtered while streaming for selections
                 if request.catalog_type == CatalogType.CATEGORY:
                     if not request.selected_items:
                         raise Exception("No categories selected")
-                    filtered_data = sheets_service.filter_by_categories(data, request.selected_items)
+                    filtered_data = await sheets_service.get_filtered_data("categories", request.selected_items)
                 elif request.catalog_type == CatalogType.AUTHOR:
                     if not request.selected_items:
                         raise Exception("No authors selected")
-                    filtered_data = sheets_service.filter_by_authors(data, request.selected_items)
+                    filtered_data = await sheets_service.get_filtered_data("authors", request.selected_items)
                 else:  # FULL
-                    filtered_data = data
+                    filtered_data = await sheets_service.get_sheet_data()
                 
                 # Generate PDF with progress callback
                 def progress_callback(progress: int, message: str):
@@ -151,23 +303,58 @@ async def generate_catalog(request: CatalogRequest, background_tasks: Background
                 output_path = os.path.join("output", filename)
                 os.makedirs("output", exist_ok=True)
                 
+                if request.preview:
+                    preview_task = asyncio.create_task(run_preview(filtered_data))
+                    background_jobs.add(preview_task)
+                    preview_task.add_done_callback(background_jobs.discard)
+                
+                def build(service, profiler=None):
+                    return service.generate_catalog(
+                        filtered_data,
+                        output_path,
+                        catalog_type=request.catalog_type.value,
+                        selected_items=request.selected_items,
+                        progress_callback=progress_callback,
+                        check_cancel=check_cancel,
+                        profiler=profiler,
+                        budget=JobBudget.from_env()
+                    )
+                
+                from services.pdf_service import PDFService
+                
                 # Generate PDF
-                await pdf_service.generate_catalog(
-                    filtered_data,
-                    output_path,
-                    catalog_type=request.catalog_type.value,
-                    selected_items=request.selected_items,
-                    progress_callback=progress_callback,
-                    check_cancel=check_cancel
-                )
+                if request.profile:
+                    from services.profiling_service import JobProfiler
+                    profiler = JobProfiler()
+                    
+                    def render_profiled():
+                        """Own thread and event loop, so the profile sees only this job"""
+                        profiler.start()
+                        try:
+                            return asyncio.run(build(PDFService(), profiler))
+                        finally:
+                            profiler.stop()
+                            profile_paths[task_id] = profiler.save(output_path)
+                    
+                    metrics = await asyncio.to_thread(render_profiled)
+                else:
+                    # Own instance: budget step-down changes image quality for this job only
+                    metrics = await build(PDFService())
                 
                 # Update progress to complete
+                message = "Catalog generated successfully"
+                budget_report = metrics.get("budget")
+                if budget_report and budget_report["degraded"]:
+                    message += f" at reduced image quality ({'; '.join(budget_report['reasons'])})"
                 progress_store[task_id] = {
                     "progress": 100,
                     "status": "complete",
-                    "message": "Catalog generated successfully",
-                    "file_path": output_path
+                    "message": message,
+                    "file_path": output_path,
+                    "metrics": metrics
                 }
+                if task_id in profile_paths:
+                    progress_store[task_id]["profile_path"] = profile_paths[task_id]
             except Exception as e:
                 print(f"[{task_id}] Error: {e}")
                 progress_store[task_id] = {
@@ -203,6 +390,133 @@ async def generate_catalog(request: CatalogRequest, background_tasks: Background
             cancellation_tokens.pop(task_id, None)
 
 
+@app.post("/api/catalog/batch")
+async def generate_catalog_batch(request: BatchCatalogRequest, background_tasks: BackgroundTasks):
+    """
+    Generate several PDF catalogs in one job
+    Sheet data is loaded and indexed once, images are fetched once for all
+    catalogs, and the PDFs are rendered in parallel. Download as a ZIP.
+    """
+    try:
+        if not request.catalogs:
+            raise HTTPException(status_code=400, detail="No catalogs requested")
+        
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        task_id = f"batch_{datetime.now().timestamp()}"
+        archive_name = safe_filename(request.archive_name or f"catalogs_{stamp}")
+        filename = f"{archive_name}.zip"
+        
+        progress_store[task_id] = {
+            "progress": 0,
+            "status": "starting",
+            "message": f"Initializing {len(request.catalogs)} catalogs..."
+        }
+        cancellation_tokens[task_id] = False
+        
+        def check_cancel():
+            return cancellation_tokens.get(task_id, False)
+        
+        async def run_batch():
+            try:
+                sheets_service = get_sheets_service()
+                
+                # One data pass and one index for every catalog in the batch
+                data = await sheets_service.get_sheet_data()
+                index = sheets_service.build_index(data)
+                
+                batch_dir = os.path.join("output", task_id)
+                os.makedirs(batch_dir, exist_ok=True)
+                
+                jobs = []
+                for idx, spec in enumerate(request.catalogs, 1):
+                    if spec.catalog_type == CatalogType.CATEGORY:
+                        if not spec.selected_items:
+                            raise Exception(f"Catalog {idx}: no categories selected")
+                        filtered_data = sheets_service.filter_by_index(data, index, "categories", spec.selected_items)
+                    elif spec.catalog_type == CatalogType.AUTHOR:
+                        if not spec.selected_items:
+                            raise Exception(f"Catalog {idx}: no authors selected")
+                        filtered_data = sheets_service.filter_by_index(data, index, "authors", spec.selected_items)
+                    else:  # FULL
+                        filtered_data = data
+                    
+                    label = spec.selected_items[0] if spec.selected_items else "full"
+                    if spec.selected_items and len(spec.selected_items) > 1:
+                        label += f"_and_{len(spec.selected_items) - 1}_more"
+                    jobs.append({
+                        "data": filtered_data,
+                        "output_path": os.path.join(batch_dir, f"{idx:03d}_{safe_filename(label)}.pdf"),
+                        "catalog_type": spec.catalog_type.value,
+                        "selected_items": spec.selected_items,
+                    })
+                
+                def progress_callback(progress: int, message: str):
+                    print(f"[{task_id}] {progress}%: {message}")
+                    progress_store[task_id] = {
+                        "progress": progress,
+                        "status": "generating",
+                        "message": message
+                    }
+                
+                from services.pdf_service import PDFService
+                results = await PDFService().generate_batch(
+                    jobs,
+                    progress_callback=progress_callback,
+                    check_cancel=check_cancel
+                )
+                
+                failed = [r for r in results if r["error"]]
+                progress_store[task_id] = {
+                    "progress": 100,
+                    "status": "complete",
+                    "message": f"Generated {len(results) - len(failed)}/{len(results)} catalogs",
+                    "filename": filename,
+                    "files": [r["output_path"] for r in results if not r["error"]],
+                    "errors": {os.path.basename(r["output_path"]): r["error"] for r in failed}
+                }
+            except Exception as e:
+                print(f"[{task_id}] Error: {e}")
+                progress_store[task_id] = {
+                    "progress": 0,
+                    "status": "error",
+                    "message": str(e)
+                }
+            finally:
+                cancellation_tokens.pop(task_id, None)
+        
+        background_tasks.add_task(run_batch)
+        
+        return {
+            "success": True,
+            "task_id": task_id,
+            "filename": filename
+        }
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/catalog/batch/download/{task_id}")
+async def download_catalog_batch(task_id: str):
+    """Stream all PDFs of a finished batch job as one ZIP"""
+    progress = progress_store.get(task_id)
+    if not progress or progress.get("status") != "complete" or "files" not in progress:
+        raise HTTPException(status_code=404, detail="Batch not found or not complete")
+    
+    files = [(path, os.path.basename(path)) for path in progress["files"]]
+    filename = progress["filename"]
+    
+    return StreamingResponse(
+        stream_zip(files),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}"
+        }
+    )
+
+
 @app.post("/api/catalog/cancel/{task_id}")
 async def cancel_task(task_id: str):
     """Cancel a running generation task"""
@@ -219,24 +533,71 @@ async def get_progress(task_id: str):
     if task_id not in progress_store:
         raise HTTPException(status_code=404, detail="Task not found")
     
-    return progress_store[task_id]
+    return task_record(task_id)
+
+
+@app.get("/api/catalog/profile/{task_id}")
+async def get_profile(task_id: str, raw: bool = False):
+    """
+    Get the profile captured for a task started with "profile": true
+    Returns the JSON summary, or the raw cProfile dump with ?raw=true
+    """
+    profile_path = profile_paths.get(task_id)
+    if not profile_path or not os.path.exists(profile_path):
+        raise HTTPException(status_code=404, detail="No profile for this task")
+    
+    if raw:
+        raw_path = profile_path[:-len(".profile.json")] + ".prof"
+        if not os.path.exists(raw_path):
+            raise HTTPException(status_code=404, detail="No raw profile for this task")
+        return FileResponse(raw_path, media_type="application/octet-stream",
+                            filename=os.path.basename(raw_path))
+    
+    with open(profile_path, encoding="utf-8") as f:
+        return json.load(f)
 
 
 @app.get("/api/catalog/download/{filename}")
-async def download_catalog(filename: str):
-    """Download generated PDF catalog"""
-    file_path = os.path.join("output", filename)
+async def download_catalog(filename: str, request: Request, inline: bool = False):
+    """
+    Download generated PDF catalog
+    Supports HTTP Range requests so PDF viewers can fetch pages on demand;
+    pass ?inline=true to open in the browser instead of saving
+    """
+    file_path = os.path.join("output", os.path.basename(filename))
     
     if not os.path.exists(file_path):
         raise HTTPException(status_code=404, detail="File not found")
     
-    return FileResponse(
-        file_path,
+    size = file_size(file_path)
+    disposition = "inline" if inline else "attachment"
+    headers = {
+        "Content-Disposition": f"{disposition}; filename={filename}",
+        "Accept-Ranges": "bytes",
+    }
+    
+    try:
+        byte_range = parse_range_header(request.headers.get("range"), size)
+    except RangeNotSatisfiable:
+        raise HTTPException(status_code=416, detail="Requested range not satisfiable",
+                            headers={"Content-Range": f"bytes */{size}"})
+    
+    if byte_range is None:
+        return FileResponse(
+            file_path,
+            media_type="application/pdf",
+            filename=filename,
+            headers=headers
+        )
+    
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        iter_file_range(file_path, start, end),
+        status_code=206,
         media_type="application/pdf",
-        filename=filename,
-        headers={
-            "Content-Disposition": f"attachment; filename={filename}"
-        }
+        headers=headers
     )
 
 
@@ -248,7 +609,7 @@ async def stream_progress(task_id: str):
     async def event_generator():
         while True:
             if task_id in progress_store:
-                progress_data = progress_store[task_id]
+                progress_data = task_record(task_id)
                 yield f"data: {json.dumps(progress_data)}\n\n"
                 
                 # Stop streaming if complete or error
@@ -14,6 +14,8 @@ class CatalogRequest(BaseModel):
     """Request model for catalog generation"""
     catalog_type: CatalogType
     selected_items: Optional[List[str]] = None
+    profile: bool = False  # Capture a profile for this job only
+    preview: bool = False  # Also render a quick low-resolution preview PDF
     
     class Config:
         json_schema_extra = {
@@ -22,3 +24,20 @@ class CatalogRequest(BaseModel):
                 "selected_items": ["Fiction > Mystery", "Non-Fiction > Biography"]
             }
         }
+
+
+class BatchCatalogRequest(BaseModel):
+    """Request model for generating several catalogs in one job"""
+    catalogs: List[CatalogRequest]
+    archive_name: Optional[str] = None
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "catalogs": [
+                    {"catalog_type": "category", "selected_items": ["Fiction > Mystery"]},
+                    {"catalog_type": "category", "selected_items": ["Non-Fiction > Biography"]}
+                ],
+                "archive_name": "category_catalogs"
+            }
+        }
@@ -0,0 +1,58 @@
+import os
+import zipfile
+from typing import Iterator, List, Tuple
+
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def safe_filename(name: str) -> str:
+    """Reduce a user-supplied label to a filesystem-safe name"""
+    cleaned = "".join(c if c.isalnum() or c in "-_" else "_" for c in name.strip())
+    return cleaned.strip("_")[:80] or "catalog"
+
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back to a generator"""
+    
+    def __init__(self):
+        self.chunks = []
+        self.offset = 0
+    
+    def write(self, b) -> int:
+        self.chunks.append(bytes(b))
+        self.offset += len(b)
+        return len(b)
+    
+    def tell(self) -> int:
+        return self.offset
+    
+    def flush(self):
+        pass
+    
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def stream_zip(files: List[Tuple[str, str]]) -> Iterator[bytes]:
+    """
+    Stream a ZIP archive of (path, arcname) pairs without building it on disk or in memory
+    
+    PDFs are already compressed, so entries are stored rather than deflated.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED, allowZip64=True) as archive:
+        for path, arcname in files:
+            if not os.path.exists(path):
+                continue
+            with open(path, "rb") as src, archive.open(arcname, mode="w", force_zip64=True) as dest:
+                while True:
+                    block = src.read(CHUNK_SIZE)
+                    if not block:
+                        break
+                    dest.write(block)
+                    yield sink.drain()
+            yield sink.drain()
+    yield sink.drain()
@@ -0,0 +1,150 @@
+import os
+import sys
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+
+# Image quality ladder, best first: (resolution multiple of drawn size, JPEG quality)
+QUALITY_LEVELS: List[Tuple[int, int]] = [(8, 95), (4, 85), (2, 75), (1, 60)]
+
+MB = 1024 * 1024
+
+# Step down once usage is projected past this fraction of a budget
+DEGRADE_THRESHOLD = 0.9
+# Step down before layout if this fraction of the time budget is already spent
+TIME_DEGRADE_FRACTION = 0.6
+
+
+class BudgetExceeded(Exception):
+    """A job ran past one of its budgets"""
+    pass
+
+
+def current_rss_bytes() -> Optional[int]:
+    """Resident set size of this process, or None where it can't be measured"""
+    if sys.platform.startswith("linux"):
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            return None
+    if sys.platform == "darwin":
+        import resource
+        # Peak rather than current RSS, in bytes on macOS
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return None
+
+
+class JobBudget:
+    """
+    Resource budget for one catalog job: wall time, RSS growth, temp-dir
+    bytes and output size (0 = unlimited)
+    
+    PDFService asks pressure() at checkpoints during prefetch and build. When
+    a budget is projected to run out, the job steps down QUALITY_LEVELS via
+    degrade(). check_limits() and check_output() raise BudgetExceeded once a
+    budget is actually exceeded. RSS is measured for the whole process,
+    relative to the job's start; where it can't be measured (e.g. Windows)
+    the RSS budget is disabled with a warning.
+    """
+    
+    def __init__(self, max_seconds: float = 0, max_rss_mb: float = 0,
+                 max_temp_mb: float = 0, max_output_mb: float = 0):
+        self.max_seconds = max_seconds
+        self.max_rss_bytes = max_rss_mb * MB
+        self.max_temp_bytes = max_temp_mb * MB
+        self.max_output_bytes = max_output_mb * MB
+        self.level_index = 0
+        self.reasons: List[str] = []
+        self.temp_bytes = 0
+        self.peak_rss_growth = 0
+        self._started = time.perf_counter()
+        self._rss_baseline = current_rss_bytes()
+        if self._rss_baseline is None and self.max_rss_bytes:
+            print(f"Budget: can't measure RSS on {sys.platform}, ignoring memory budget")
+            self.max_rss_bytes = 0
+    
+    @classmethod
+    def from_env(cls) -> Optional["JobBudget"]:
+        """Budget from JOB_MAX_* environment variables, or None if none are set"""
+        limits = {
+            "max_seconds": float(os.getenv("JOB_MAX_SECONDS", 0)),
+            "max_rss_mb": float(os.getenv("JOB_MAX_RSS_MB", 0)),
+            "max_temp_mb": float(os.getenv("JOB_MAX_TEMP_MB", 0)),
+            "max_output_mb": float(os.getenv("JOB_MAX_OUTPUT_MB", 0)),
+        }
+        return cls(**limits) if any(limits.values()) else None
+    
+    @property
+    def level(self) -> Tuple[int, int]:
+        return QUALITY_LEVELS[self.level_index]
+    
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._started
+    
+    def rss_growth(self) -> int:
+        rss = current_rss_bytes() if self._rss_baseline is not None else None
+        if rss is None:
+            return 0
+        growth = max(0, rss - self._rss_baseline)
+        self.peak_rss_growth = max(self.peak_rss_growth, growth)
+        return growth
+    
+    def degrade(self, reason: str) -> bool:
+        """Step down one quality level; False if already at the lowest"""
+        if self.level_index + 1 >= len(QUALITY_LEVELS):
+            return False
+        self.level_index += 1
+        scale, quality = self.level
+        self.reasons.append(f"{reason} -> images at {scale}x, JPEG quality {quality}")
+        print(f"Budget: {self.reasons[-1]}")
+        return True
+    
+    def check_limits(self):
+        """Hard limits on wall time, temp-dir bytes and memory growth"""
+        if self.max_seconds and self.elapsed() > self.max_seconds:
+            raise BudgetExceeded(f"Time budget of {self.max_seconds:.0f}s exceeded")
+        if self.max_temp_bytes and self.temp_bytes > self.max_temp_bytes:
+            raise BudgetExceeded(f"Temp dir budget of {self.max_temp_bytes / MB:.0f} MB exceeded")
+        if self.max_rss_bytes and self.rss_growth() > self.max_rss_bytes:
+            raise BudgetExceeded(f"Memory budget of {self.max_rss_bytes / MB:.0f} MB exceeded")
+    
+    def pressure(self, done: int = 0, total: int = 0, before_layout: bool = False) -> Optional[str]:
+        """
+        Reason the job should step down now, or None
+        
+        Args:
+            done, total: Images fetched so far and expected, to project temp and output bytes
+            before_layout: Also apply the time check that only lower quality can help with
+        """
+        projected = self.temp_bytes * total / done if done and total > done else self.temp_bytes
+        
+        if self.max_temp_bytes and projected > self.max_temp_bytes * DEGRADE_THRESHOLD:
+            return f"temp dir projected at {projected / MB:.0f} MB of {self.max_temp_bytes / MB:.0f} MB"
+        # Embedded JPEGs dominate the output, so image bytes are a good size estimate
+        if self.max_output_bytes and projected > self.max_output_bytes * DEGRADE_THRESHOLD:
+            return f"output projected at {projected / MB:.0f} MB of {self.max_output_bytes / MB:.0f} MB"
+        growth = self.rss_growth()
+        if self.max_rss_bytes and growth > self.max_rss_bytes * DEGRADE_THRESHOLD:
+            return f"memory grew {growth / MB:.0f} MB of {self.max_rss_bytes / MB:.0f} MB"
+        if before_layout and self.max_seconds and self.elapsed() > self.max_seconds * TIME_DEGRADE_FRACTION:
+            return f"{self.elapsed():.0f}s of {self.max_seconds:.0f}s used before layout"
+        return None
+    
+    def check_output(self, output_path: str):
+        """Hard output-size limit, checked after the PDF is written"""
+        size = os.path.getsize(output_path)
+        if self.max_output_bytes and size > self.max_output_bytes:
+            raise BudgetExceeded(f"Output of {size / MB:.0f} MB exceeds budget of {self.max_output_bytes / MB:.0f} MB")
+    
+    def report(self) -> Dict[str, Any]:
+        scale, quality = self.level
+        return {
+            "image_scale": scale,
+            "jpeg_quality": quality,
+            "degraded": bool(self.reasons),
+            "reasons": self.reasons,
+            "elapsed_seconds": round(self.elapsed(), 2),
+            "temp_mb": round(self.temp_bytes / MB, 1),
+            "peak_rss_growth_mb": round(self.peak_rss_growth / MB, 1),
+        }
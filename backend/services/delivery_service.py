@@ -0,0 +1,116 @@
+import gzip
+import json
+import os
+from collections import OrderedDict
+from typing import Any, Iterator, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response
+
+
+CHUNK_SIZE = 256 * 1024
+
+# JSON bodies smaller than this are sent uncompressed
+GZIP_MIN_SIZE = 1024
+# Compressed bodies kept per ETag so repeated page loads skip JSON encoding and gzip
+_BODY_CACHE_SIZE = 64
+_body_cache: "OrderedDict[Tuple[str, bool], Tuple[bytes, bool]]" = OrderedDict()
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range_header(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse an HTTP Range header into an inclusive (start, end) byte range
+    
+    Only single ranges are served; for multi-range requests the first range is
+    used, which viewers handle fine. Returns None when the whole file should be sent.
+    """
+    if not header or not header.startswith("bytes="):
+        return None
+    
+    spec = header[len("bytes="):].split(",")[0].strip()
+    start_txt, _, end_txt = spec.partition("-")
+    try:
+        if start_txt:
+            start = int(start_txt)
+            end = int(end_txt) if end_txt else size - 1
+        else:
+            # Suffix range: last N bytes
+            length = int(end_txt)
+            if length <= 0:
+                raise RangeNotSatisfiable()
+            start, end = max(0, size - length), size - 1
+    except ValueError:
+        return None
+    
+    if start >= size or start > end:
+        raise RangeNotSatisfiable()
+    return start, min(end, size - 1)
+
+
+def iter_file_range(path: str, start: int, end: int) -> Iterator[bytes]:
+    """Yield bytes start..end (inclusive) of a file in chunks"""
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            block = f.read(min(CHUNK_SIZE, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            yield block
+
+
+def file_size(path: str) -> int:
+    return os.stat(path).st_size
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against our ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    ours = etag[2:] if etag.startswith("W/") else etag
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if (tag[2:] if tag.startswith("W/") else tag) == ours:
+            return True
+    return False
+
+
+def cached_json_response(request: Request, payload: Any, etag: str) -> Response:
+    """
+    JSON response with an ETag, 304 on a matching If-None-Match, and gzip when accepted
+    
+    The etag must change whenever payload does; encoded bodies are cached by it.
+    """
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    
+    use_gzip = "gzip" in request.headers.get("accept-encoding", "")
+    key = (etag, use_gzip)
+    cached = _body_cache.get(key)
+    if cached is None:
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        compressed = use_gzip and len(body) >= GZIP_MIN_SIZE
+        if compressed:
+            body = gzip.compress(body, compresslevel=6)
+        cached = _body_cache[key] = (body, compressed)
+        while len(_body_cache) > _BODY_CACHE_SIZE:
+            _body_cache.popitem(last=False)
+    else:
+        _body_cache.move_to_end(key)
+    
+    body, compressed = cached
+    if compressed:
+        headers["Content-Encoding"] = "gzip"
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,159 @@
+import os
+import time
+from typing import Dict, Any, Optional
+from urllib.parse import urlsplit
+
+
+# Bounds for image-fetch concurrency
+FETCH_MIN_CONCURRENCY = int(os.getenv("IMAGE_FETCH_MIN_CONCURRENCY", 1))
+FETCH_MAX_CONCURRENCY = int(os.getenv("IMAGE_FETCH_MAX_CONCURRENCY", 32))     # Per host
+FETCH_INITIAL_CONCURRENCY = int(os.getenv("IMAGE_FETCH_INITIAL_CONCURRENCY", 4))
+FETCH_TOTAL_CONCURRENCY = int(os.getenv("IMAGE_FETCH_TOTAL_CONCURRENCY", 48))  # All hosts
+
+# A response slower than this multiple of the host's best latency counts as congestion,
+# if it is also at least LATENCY_MIN_INCREASE seconds slower (fast hosts jitter by multiples)
+LATENCY_TOLERANCE = 2.5
+LATENCY_MIN_INCREASE = 0.05
+THROTTLE_BACKOFF = 0.5
+CONGESTION_BACKOFF = 0.85
+# Pause before re-sending to a host that throttled us without a Retry-After (doubles per retry)
+THROTTLE_PAUSE = 1.0
+MAX_THROTTLE_PAUSE = 30.0
+
+
+class _HostState:
+    def __init__(self, limit: float):
+        self.limit = limit
+        self.peak_limit = limit
+        self.in_flight = 0
+        self.sent = 0
+        self.recovery_until = 0  # Requests sent before the last decrease can't trigger another
+        self.resume_at = 0.0     # Monotonic time before which nothing new is sent (throttle pause)
+        self.slow_start = True
+        self.best_latency = None
+        self.requests = 0
+        self.throttled = 0
+        self.errors = 0
+        self.total_latency = 0.0
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD concurrency controller for image fetching, with state per host
+    
+    Each host starts at FETCH_INITIAL_CONCURRENCY and doubles its limit per
+    round of fast responses (slow start) until the first congestion signal,
+    then grows by about one slot per round (additive increase). 429/503
+    responses and connection failures halve the limit, and pause() holds a
+    throttling host back before its requests are retried; responses much slower
+    than the host's best latency shrink it slightly. Limits stay within
+    [FETCH_MIN_CONCURRENCY, FETCH_MAX_CONCURRENCY] and the sum of in-flight
+    requests never exceeds FETCH_TOTAL_CONCURRENCY. Latency means time to
+    response headers, so large bodies do not read as congestion.
+    
+    Not thread-safe: drive it from a single dispatcher (the event loop).
+    """
+    
+    def __init__(self, min_limit: int = FETCH_MIN_CONCURRENCY, max_limit: int = FETCH_MAX_CONCURRENCY,
+                 initial_limit: int = FETCH_INITIAL_CONCURRENCY, total_limit: int = FETCH_TOTAL_CONCURRENCY):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.initial_limit = min(max(initial_limit, self.min_limit), self.max_limit)
+        self.total_limit = max(1, total_limit)
+        self.hosts: Dict[str, _HostState] = {}
+        self.in_flight = 0
+        self.peak_in_flight = 0
+    
+    @staticmethod
+    def host_of(url: str) -> str:
+        return urlsplit(url).netloc.lower()
+    
+    def _state(self, host: str) -> _HostState:
+        if host not in self.hosts:
+            self.hosts[host] = _HostState(float(self.initial_limit))
+        return self.hosts[host]
+    
+    def can_start(self, host: str) -> bool:
+        state = self._state(host)
+        return (self.in_flight < self.total_limit and state.in_flight < int(state.limit)
+                and time.monotonic() >= state.resume_at)
+    
+    def pause(self, host: str, seconds: float):
+        """Send nothing new to host for the next seconds (e.g. its Retry-After)"""
+        state = self._state(host)
+        state.resume_at = max(state.resume_at, time.monotonic() + min(seconds, MAX_THROTTLE_PAUSE))
+    
+    def resume_delay(self, hosts) -> Optional[float]:
+        """Seconds until the first of hosts comes out of a pause, or None if none is paused"""
+        now = time.monotonic()
+        waits = [self._state(h).resume_at - now for h in hosts if self._state(h).resume_at > now]
+        return min(waits) if waits else None
+    
+    def started(self, host: str) -> int:
+        """Record a request starting; returns the token to pass to finished()"""
+        state = self._state(host)
+        state.in_flight += 1
+        state.sent += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        return state.sent
+    
+    def finished(self, host: str, token: int, latency: float, throttled: bool = False, error: bool = False):
+        """Record one completed request and adjust the host's limit
+        
+        Decreases happen at most once per window: responses to requests that
+        were already in flight at the last decrease only update counters.
+        """
+        state = self._state(host)
+        state.in_flight -= 1
+        self.in_flight -= 1
+        state.requests += 1
+        state.total_latency += latency
+        
+        in_recovery = token <= state.recovery_until
+        if throttled or error:
+            if throttled: state.throttled += 1
+            if error: state.errors += 1
+            if not in_recovery:
+                state.limit *= THROTTLE_BACKOFF
+                state.recovery_until = state.sent
+            state.slow_start = False
+        elif latency <= 0:
+            pass  # Served without a request (cache hit); no signal
+        elif state.best_latency is not None and latency > state.best_latency * LATENCY_TOLERANCE \
+                and latency - state.best_latency >= LATENCY_MIN_INCREASE:
+            if not in_recovery:
+                state.limit *= CONGESTION_BACKOFF
+                state.recovery_until = state.sent
+            state.slow_start = False
+        elif state.slow_start:
+            state.limit += 1
+        else:
+            state.limit += 1 / state.limit
+        
+        if latency > 0 and not (throttled or error):
+            state.best_latency = latency if state.best_latency is None else min(state.best_latency, latency)
+        
+        state.limit = min(max(state.limit, self.min_limit), self.max_limit)
+        state.peak_limit = max(state.peak_limit, state.limit)
+    
+    def current_limit(self) -> int:
+        """Combined concurrency currently allowed across hosts"""
+        return min(self.total_limit, sum(int(s.limit) for s in self.hosts.values()))
+    
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "peak_in_flight": self.peak_in_flight,
+            "bounds": {"min": self.min_limit, "max": self.max_limit, "total": self.total_limit},
+            "hosts": {
+                host: {
+                    "final_concurrency": int(s.limit),
+                    "peak_concurrency": int(s.peak_limit),
+                    "requests": s.requests,
+                    "throttled": s.throttled,
+                    "errors": s.errors,
+                    "avg_latency_ms": round(1000 * s.total_latency / s.requests, 1) if s.requests else None,
+                }
+                for host, s in self.hosts.items()
+            },
+        }
@@ -0,0 +1,221 @@
+import os
+import re
+import tempfile
+import threading
+import time
+import zipfile
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit, unquote
+
+
+# Directories and/or .zip archives of cover scans named by ISBN/SKU (os.pathsep-separated)
+IMAGE_SOURCE_DIRS = [p for p in os.getenv("IMAGE_SOURCE_DIRS", "").split(os.pathsep) if p]
+# Local mirror of the image host(s): <root>/<host>/<path> or <root>/<path>
+IMAGE_MIRROR_DIR = os.getenv("IMAGE_MIRROR_DIR", "")
+# Roots file:// URLs may point into (default: the source dirs and mirror)
+IMAGE_FILE_URL_ROOTS = [p for p in os.getenv("IMAGE_FILE_URL_ROOTS", "").split(os.pathsep) if p]
+# Rebuild filename indexes after this many seconds
+IMAGE_INDEX_TTL = float(os.getenv("IMAGE_INDEX_TTL", 300))
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif", ".bmp", ".tif", ".tiff"}
+
+
+def normalize_sku(value: str) -> str:
+    """ISBN/SKU reduced to lowercase letters and digits, so 978-0-14 matches 978014"""
+    return re.sub(r"[^0-9a-z]", "", str(value).lower())
+
+
+class ImageResolver(ABC):
+    """Resolves image requests to local files; HTTP remains the fallback in PDFService"""
+
+    name = "resolver"
+
+    @abstractmethod
+    def resolve_batch(self, requests: Dict[str, Dict[str, str]], temp_dir: Optional[str]) -> Dict[str, str]:
+        """
+        Resolve as many requests as possible
+
+        Args:
+            requests: key -> {"url": ..., "sku": ...}
+            temp_dir: Where members extracted from archives may be written
+
+        Returns:
+            key -> local file path, for the requests this resolver found
+        """
+
+
+class SkuIndexResolver(ImageResolver):
+    """Covers in local directories or .zip archives, matched by file name stem == SKU"""
+
+    name = "sku_index"
+
+    def __init__(self, sources: List[str]):
+        self.sources = sources
+        self.files: Dict[str, str] = {}            # sku -> path on disk
+        self.members: Dict[str, tuple] = {}        # sku -> (archive path, member name)
+        self.built_at = 0.0
+        self._lock = threading.Lock()
+
+    def _build_index(self):
+        files, members = {}, {}
+        for source in self.sources:
+            if os.path.isdir(source):
+                for dirpath, _, filenames in os.walk(source):
+                    for filename in filenames:
+                        stem, ext = os.path.splitext(filename)
+                        if ext.lower() in IMAGE_EXTENSIONS:
+                            files.setdefault(normalize_sku(stem), os.path.join(dirpath, filename))
+            elif zipfile.is_zipfile(source):
+                with zipfile.ZipFile(source) as archive:
+                    for member in archive.namelist():
+                        stem, ext = os.path.splitext(os.path.basename(member))
+                        if ext.lower() in IMAGE_EXTENSIONS:
+                            members.setdefault(normalize_sku(stem), (source, member))
+            else:
+                print(f"Image source not found or unsupported: {source}")
+        self.files, self.members = files, members
+        self.built_at = time.monotonic()
+        print(f"Indexed {len(files)} cover files and {len(members)} archive members")
+
+    def ensure_index(self):
+        """Build the index, or rebuild it after IMAGE_INDEX_TTL; walks the disk, so keep off the event loop"""
+        with self._lock:
+            if not self.built_at or time.monotonic() - self.built_at > IMAGE_INDEX_TTL:
+                self._build_index()
+
+    def has_sku(self, sku: str) -> bool:
+        """Lookup in the current index only; False until ensure_index has run"""
+        sku = normalize_sku(sku)
+        return sku in self.files or sku in self.members
+
+    def resolve_batch(self, requests, temp_dir):
+        self.ensure_index()
+        resolved = {}
+        by_archive: Dict[str, List[tuple]] = {}
+        for key, req in requests.items():
+            sku = normalize_sku(req.get("sku", ""))
+            if not sku:
+                continue
+            if sku in self.files:
+                resolved[key] = self.files[sku]
+            elif sku in self.members:
+                archive_path, member = self.members[sku]
+                by_archive.setdefault(archive_path, []).append((key, member))
+
+        # One open per archive for the whole batch
+        for archive_path, wanted in by_archive.items():
+            with zipfile.ZipFile(archive_path) as archive:
+                for key, member in wanted:
+                    fd, path = tempfile.mkstemp(suffix=os.path.splitext(member)[1], dir=temp_dir)
+                    with os.fdopen(fd, "wb") as out:
+                        out.write(archive.read(member))
+                    resolved[key] = path
+        return resolved
+
+
+class FileUrlResolver(ImageResolver):
+    """file:// URLs, restricted to configured roots"""
+
+    name = "file_url"
+
+    def __init__(self, roots: List[str]):
+        self.roots = [os.path.realpath(r) for r in roots if r]
+
+    def resolve_batch(self, requests, temp_dir):
+        resolved = {}
+        for key, req in requests.items():
+            url = req.get("url", "")
+            if not url.startswith("file://"):
+                continue
+            path = os.path.realpath(unquote(urlsplit(url).path))
+            allowed = any(os.path.commonpath([path, root]) == root for root in self.roots)
+            if allowed and os.path.isfile(path):
+                resolved[key] = path
+            elif not allowed:
+                print(f"Ignoring file URL outside allowed roots: {url[:80]}")
+        return resolved
+
+
+class MirrorResolver(ImageResolver):
+    """Local copy of an object store / CDN, laid out as <root>/<host>/<key> or <root>/<key>"""
+
+    name = "mirror"
+
+    def __init__(self, root: str):
+        self.root = os.path.realpath(root)
+
+    def resolve_batch(self, requests, temp_dir):
+        resolved = {}
+        for key, req in requests.items():
+            url = req.get("url", "")
+            if not url.startswith("http"):
+                continue
+            parts = urlsplit(url)
+            object_key = unquote(parts.path).lstrip("/")
+            if not object_key:
+                continue
+            for candidate in (os.path.join(self.root, parts.netloc, object_key),
+                              os.path.join(self.root, object_key)):
+                candidate = os.path.realpath(candidate)
+                if candidate.startswith(self.root + os.sep) and os.path.isfile(candidate):
+                    resolved[key] = candidate
+                    break
+        return resolved
+
+
+class ResolverChain:
+    """Tries each resolver in order on whatever the previous ones did not find"""
+
+    def __init__(self, resolvers: List[ImageResolver]):
+        self.resolvers = resolvers
+
+    def refresh(self):
+        """Build or refresh filename indexes that are missing or older than IMAGE_INDEX_TTL (blocking)"""
+        for resolver in self.resolvers:
+            if isinstance(resolver, SkuIndexResolver):
+                resolver.ensure_index()
+
+    def has_sku(self, sku: str) -> bool:
+        """Whether a SKU-indexed source holds a cover for sku (as of the last refresh)"""
+        return any(r.has_sku(sku) for r in self.resolvers if isinstance(r, SkuIndexResolver))
+
+    def resolve_batch(self, requests: Dict[str, Dict[str, str]], temp_dir: Optional[str]) -> Dict[str, tuple]:
+        """key -> (local path, resolver name)"""
+        resolved = {}
+        remaining = dict(requests)
+        for resolver in self.resolvers:
+            if not remaining:
+                break
+            try:
+                found = resolver.resolve_batch(remaining, temp_dir)
+            except Exception as e:
+                print(f"Image resolver {resolver.name} failed: {e}")
+                continue
+            for key, path in found.items():
+                resolved[key] = (path, resolver.name)
+                remaining.pop(key, None)
+        return resolved
+
+
+_chain: Optional[ResolverChain] = None
+_chain_lock = threading.Lock()
+
+
+def get_resolver_chain() -> ResolverChain:
+    """Process-wide resolver chain from IMAGE_* settings; empty when none are configured"""
+    global _chain
+    if _chain is None:
+        with _chain_lock:
+            if _chain is None:
+                resolvers: List[ImageResolver] = []
+                if IMAGE_SOURCE_DIRS:
+                    resolvers.append(SkuIndexResolver(IMAGE_SOURCE_DIRS))
+                file_roots = IMAGE_FILE_URL_ROOTS or \
+                    [p for p in IMAGE_SOURCE_DIRS if os.path.isdir(p)] + ([IMAGE_MIRROR_DIR] if IMAGE_MIRROR_DIR else [])
+                if file_roots:
+                    resolvers.append(FileUrlResolver(file_roots))
+                if IMAGE_MIRROR_DIR:
+                    resolvers.append(MirrorResolver(IMAGE_MIRROR_DIR))
+                _chain = ResolverChain(resolvers)
+    return _chain
@@ -4,10 +4,13 @@ import requests
 import tempfile
 import shutil
 import concurrent.futures
+import multiprocessing
 import asyncio
+import time
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
-from typing import List, Dict, Callable, Optional
+from typing import List, Dict, Callable, Optional, Tuple
+from collections import deque, OrderedDict
 from datetime import datetime
 from PIL import Image as PILImage
 from reportlab.lib.pagesizes import letter
@@ -17,6 +20,13 @@ from reportlab.lib.units import inch
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak, Image as RLImage
 from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT
 
+from services.profiling_service import JobProfiler
+from services.fetch_controller import (
+    AdaptiveConcurrency, FETCH_TOTAL_CONCURRENCY, THROTTLE_PAUSE
+)
+from services.budget_service import JobBudget
+from services.image_resolvers import get_resolver_chain, normalize_sku
+
 
 # Configuration constants
 COLS_PER_PAGE = 6
@@ -25,6 +35,8 @@ ITEMS_PER_PAGE = COLS_PER_PAGE * ROWS_PER_PAGE
 
 IMG_WIDTH = 70
 IMG_HEIGHT = 85
+IMAGE_SCALE = 8  # Stored image resolution relative to the drawn size (HiDPI)
+JPEG_QUALITY = 95
 CELL_WIDTH = 85
 CELL_HEIGHT = 135
 
@@ -33,6 +45,25 @@ RIGHT_MARGIN = 0.2 * inch
 TOP_MARGIN = 0.1 * inch
 BOTTOM_MARGIN = 0.1 * inch
 
+# Preview mode: first N pages of each section with small thumbnails
+PREVIEW_PAGES_PER_SECTION = int(os.getenv("PREVIEW_PAGES_PER_SECTION", 1))
+PREVIEW_IMAGE_SCALE = 1
+PREVIEW_JPEG_QUALITY = 70
+
+# Post-process output into a linearized PDF with object/xref streams (needs pikepdf)
+PDF_LINEARIZE = os.getenv("PDF_LINEARIZE", "true").lower() in ("1", "true", "yes")
+
+# Worker processes used to build PDFs in a batch job
+BATCH_RENDER_WORKERS = int(os.getenv("BATCH_RENDER_WORKERS", os.cpu_count() or 2))
+
+# Flyweight caches for repeated cell content (entries per job)
+FRAGMENT_CACHE_SIZE = 8192
+CELL_CACHE_SIZE = 50000
+
+# Responses that mean a host wants us to slow down; retried by prefetch_images, not urllib3
+THROTTLE_STATUSES = (429, 503)
+THROTTLE_RETRIES = 5
+
 BLACK_SQUARE_URL = "https://dummyimage.com/70x85/e0e0e0/000000.png&text=No+Image"
 
 CATEGORY_COLORS = [
@@ -41,14 +72,66 @@ CATEGORY_COLORS = [
 ]
 
 
+class _BoundedCache:
+    """Small LRU map with hit/miss counters"""
+    
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key):
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        return value
+    
+    def put(self, key, value):
+        self.entries[key] = value
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+    
+    def stats(self) -> Dict[str, int]:
+        return {'built': self.misses, 'reused': self.hits}
+
+
+class _PrewrappedParagraph(Paragraph):
+    """Paragraph that keeps its line breaks when wrapped again at the same width.
+
+    Shared between cells by the fragment cache, so markup is parsed and lines
+    are broken once per distinct (text, style) rather than once per placement.
+    """
+    _wrapped_width = None
+
+    def wrap(self, availWidth, availHeight):
+        if self._wrapped_width == availWidth:
+            return self.width, self.height
+        size = Paragraph.wrap(self, availWidth, availHeight)
+        self._wrapped_width = availWidth
+        return size
+
+
 class PDFService:
-    """Service for generating PDF catalogs using Parallel Fetching and Disk-Backed Rendering"""
+    """Service for generating PDF catalogs using Parallel Fetching and Disk-Backed Rendering
+
+    An instance holds per-job state (temp dir, image cache, image quality and the
+    cell/fragment caches), so it renders one job at a time; create one per job.
+    """
     
     def __init__(self):
         self.styles = getSampleStyleSheet()
         self.custom_styles = {}
         self.image_cache = {}  # URL -> Local Temp Path
+        self._fragment_cache = _BoundedCache(FRAGMENT_CACHE_SIZE)  # (text, style) -> Paragraph
+        self._cell_cache = _BoundedCache(CELL_CACHE_SIZE)  # product fields -> cell flowables
         self.temp_dir = None
+        self.image_scale = IMAGE_SCALE
+        self.jpeg_quality = JPEG_QUALITY
+        self._job_running = False
         self.session = self._setup_session()
         self.setup_styles()
     
@@ -58,12 +141,15 @@ class PDFService:
         retry_strategy = Retry(
             total=5,
             backoff_factor=1,
-            status_forcelist=[429, 500, 502, 503, 504],
-            allowed_methods=["HEAD", "GET", "OPTIONS"]
+            status_forcelist=[500, 502, 504],
+            allowed_methods=["HEAD", "GET", "OPTIONS"],
+            # THROTTLE_STATUSES go straight back to AdaptiveConcurrency; urllib3 would
+            # otherwise retry 429/503 itself whenever a Retry-After header is present
+            respect_retry_after_header=False
         )
         adapter = HTTPAdapter(
             pool_connections=20,
-            pool_maxsize=20,
+            pool_maxsize=FETCH_TOTAL_CONCURRENCY,
             max_retries=retry_strategy
         )
         session.mount("http://", adapter)
@@ -122,35 +208,103 @@ class PDFService:
         return CATEGORY_COLORS[hash_val % len(CATEGORY_COLORS)]
     
     def fetch_image_sync(self, url: str) -> Optional[str]:
-        """Fetch, resize (8x HiDPI), and save image to disk with session-based retries."""
-        if not url or str(url).strip() == "": return None
-        if url in self.image_cache: return self.image_cache[url]
+        """Fetch, resize (image_scale x HiDPI), and save image to disk with session-based retries."""
+        return self._fetch_image(url)[0]
+
+    def _fetch_image(self, url: str) -> Tuple[Optional[str], Dict]:
+        """fetch_image_sync plus the signals the concurrency controller needs:
+        request latency, whether the host throttled us (429/503, never retried
+        here) and whether the request failed outright."""
+        signal = {'latency': 0.0, 'throttled': False, 'error': False, 'retry_after': None}
+        if not url or str(url).strip() == "": return None, signal
+        if url in self.image_cache: return self.image_cache[url], signal
         
+        started = time.perf_counter()
         try:
             response = self.session.get(url, timeout=(5, 15))
+            # Time to response headers: body download time grows with cover size, not congestion
+            signal['latency'] = response.elapsed.total_seconds()
+            retries = getattr(response.raw, 'retries', None)
+            history = retries.history if retries else ()
+            signal['throttled'] = response.status_code in THROTTLE_STATUSES or \
+                any(h.status in THROTTLE_STATUSES for h in history)
+            signal['error'] = response.status_code >= 500 and not signal['throttled']
+            if response.status_code in THROTTLE_STATUSES:
+                retry_after = response.headers.get('Retry-After', '')
+                if retry_after.strip().isdigit(): signal['retry_after'] = float(retry_after)
+                return None, signal
             if response.status_code == 200:
-                img_io = io.BytesIO(response.content)
-                with PILImage.open(img_io) as img:
-                    if img.mode != 'RGB': img = img.convert('RGB')
-                    # 8x High DPI Target
-                    t_w, t_h = IMG_WIDTH * 8, IMG_HEIGHT * 8
-                    img = img.resize((t_w, t_h), PILImage.Resampling.LANCZOS)
-                    
-                    # Store on disk to save RAM
-                    fd, path = tempfile.mkstemp(suffix='.jpg', dir=self.temp_dir)
-                    os.close(fd)
-                    img.save(path, format='JPEG', quality=95, optimize=True)
-                    self.image_cache[url] = path
-                    return path
+                path = self._store_image(url, io.BytesIO(response.content))
+                return path, signal
+        except requests.RequestException as e:
+            signal['latency'] = time.perf_counter() - started
+            signal['error'] = True
+            if isinstance(e, requests.exceptions.RetryError): signal['throttled'] = True
+            print(f"Fetch failed for {url[:50]}: {e}")
         except Exception as e:
             print(f"Fetch failed for {url[:50]}: {e}")
             
-        return None
+        return None, signal
+
+    def _store_image(self, key: str, source) -> str:
+        """Resize an image (file path or file object) to the current scale/quality,
+        save it as JPEG in temp_dir and cache it under key"""
+        with PILImage.open(source) as img:
+            if img.mode != 'RGB': img = img.convert('RGB')
+            # High DPI Target
+            t_w, t_h = IMG_WIDTH * self.image_scale, IMG_HEIGHT * self.image_scale
+            img = img.resize((t_w, t_h), PILImage.Resampling.LANCZOS)
+            
+            # Store on disk to save RAM
+            fd, path = tempfile.mkstemp(suffix='.jpg', dir=self.temp_dir)
+            os.close(fd)
+            img.save(path, format='JPEG', quality=self.jpeg_quality, optimize=True)
+        self.image_cache[key] = path
+        return path
+
+    def _load_local_image(self, key: str, source_path: str) -> Optional[str]:
+        """Store a locally resolved cover; extracted archive members are removed afterwards"""
+        try:
+            return self._store_image(key, source_path)
+        except Exception as e:
+            print(f"Local image failed for {source_path}: {e}")
+            return None
+        finally:
+            if self.temp_dir and os.path.dirname(os.path.realpath(source_path)) == os.path.realpath(self.temp_dir):
+                try: os.remove(source_path)
+                except OSError: pass
+
+    def _begin_job(self):
+        """Claim this instance for one job; its caches must not be shared with another"""
+        if self._job_running:
+            raise RuntimeError("PDFService is already rendering a job; use a separate instance per job")
+        self._job_running = True
+
+    def _step_down(self, budget: JobBudget, reason: str) -> bool:
+        """Move to the budget's next quality level and shrink already-fetched images to match"""
+        if not budget.degrade(reason):
+            return False
+        self.image_scale, self.jpeg_quality = budget.level
+        t_w, t_h = IMG_WIDTH * self.image_scale, IMG_HEIGHT * self.image_scale
+        total = 0
+        for path in list(self.image_cache.values()):
+            try:
+                with PILImage.open(path) as img:
+                    needs_resize = img.width > t_w
+                    if needs_resize:
+                        img = img.resize((t_w, t_h), PILImage.Resampling.LANCZOS)
+                if needs_resize:
+                    img.save(path, format='JPEG', quality=self.jpeg_quality, optimize=True)
+                total += os.path.getsize(path)
+            except Exception as e:
+                print(f"Re-encode failed for {path}: {e}")
+        budget.temp_bytes = total
+        return True
 
     def get_placeholder_path(self) -> str:
         """Get or create placeholder image path"""
         if BLACK_SQUARE_URL in self.image_cache: return self.image_cache[BLACK_SQUARE_URL]
-        img = PILImage.new('RGB', (IMG_WIDTH * 8, IMG_HEIGHT * 8), color='#f0f0f0')
+        img = PILImage.new('RGB', (IMG_WIDTH * self.image_scale, IMG_HEIGHT * self.image_scale), color='#f0f0f0')
         fd, path = tempfile.mkstemp(suffix='.jpg', dir=self.temp_dir)
         os.close(fd)
         img.save(path, format='JPEG', quality=90)
@@ -204,40 +358,179 @@ class PDFService:
             except: continue
         return products_by_category, main_categories
 
+    @staticmethod
+    def _image_keys(img_url: str, sku: str) -> Tuple[str, str]:
+        """Cache keys for a product's cover: by SKU (local sources) and by primary URL"""
+        return f"sku:{normalize_sku(sku)}", str(img_url).split(',')[0].strip()
+
+    def collect_image_sources(self, products) -> Dict[str, Dict[str, str]]:
+        """Image requests (cache key -> {'url', 'sku'}) for (img_url, sku) pairs.
+
+        Covers found in the SKU index are keyed by SKU; everything else by URL,
+        so products sharing a URL are fetched once. Reads the index as of the last
+        get_resolver_chain().refresh(), which callers run in a worker thread first.
+        """
+        chain = get_resolver_chain()
+        sources = {}
+        for img_url, sku in products:
+            sku_key, url = self._image_keys(img_url, sku)
+            if sku_key != "sku:" and chain.has_sku(sku):
+                sources[sku_key] = {'url': url, 'sku': sku}
+            elif url.startswith(('http', 'file://')):
+                sources.setdefault(url, {'url': url, 'sku': sku})
+        return sources
+
+    def collect_image_urls(self, data: List[List[str]]) -> Dict[str, Dict[str, str]]:
+        """Image requests for the primary cover of every row in data"""
+        return self.collect_image_sources(
+            (str(row[3]), str(row[0])) for row in data[1:] if len(row) > 3)
+
+    async def prefetch_images(self, sources: Dict[str, Dict[str, str]],
+                              progress_callback: Optional[Callable[[int, str], None]] = None,
+                              check_cancel: Optional[Callable[[], bool]] = None,
+                              start: int = 10, span: int = 25,
+                              budget: Optional[JobBudget] = None) -> Dict:
+        """Fetch all images in parallel into self.temp_dir, reporting progress from start to start+span.
+
+        sources maps cache keys to {'url', 'sku'} (see collect_image_sources).
+        Local resolvers (SKU index, file:// URLs, mirror) are tried first as one
+        batch; only what they miss goes over HTTP. Concurrency is adapted per host
+        by AdaptiveConcurrency; returns its summary plus local resolution counts.
+        With a budget, image quality steps down when temp/output/memory use is
+        projected to exceed it.
+        """
+        if progress_callback: progress_callback(start, f"Resolving {len(sources)} images...")
+        
+        loop = asyncio.get_running_loop()
+        resolved = await asyncio.to_thread(get_resolver_chain().resolve_batch, sources, self.temp_dir)
+        local_sources: Dict[str, int] = {}
+        if resolved:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=os.cpu_count() or 2) as executor:
+                futures = [loop.run_in_executor(executor, self._load_local_image, key, path)
+                           for key, (path, _) in resolved.items()]
+                for f in asyncio.as_completed(futures):
+                    path = await f
+                    if check_cancel and check_cancel():
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        raise Exception("Generation cancelled")
+                    if budget and path:
+                        budget.temp_bytes += os.path.getsize(path)
+            for key, (_, source) in resolved.items():
+                if key in self.image_cache:
+                    local_sources[source] = local_sources.get(source, 0) + 1
+            if budget:
+                reason = budget.pressure(len(resolved), len(sources))
+                if reason: await asyncio.to_thread(self._step_down, budget, reason)
+                budget.check_limits()
+        
+        remote = list(dict.fromkeys(req['url'] for key, req in sources.items()
+                                    if key not in self.image_cache and req['url'].startswith('http')))
+        if progress_callback:
+            progress_callback(start, f"{sum(local_sources.values())} images found locally, "
+                                     f"fetching {len(remote)} in parallel...")
+        
+        controller = AdaptiveConcurrency()
+        queues: Dict[str, deque] = {}
+        for url in remote:
+            queues.setdefault(controller.host_of(url), deque()).append(url)
+        
+        throttle_attempts: Dict[str, int] = {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=controller.total_limit) as executor:
+            pending: Dict[asyncio.Future, Tuple[str, int, str]] = {}
+            done_count = 0
+            while queues or pending:
+                # Start as many fetches as each host's current limit allows
+                for host in list(queues):
+                    while queues[host] and controller.can_start(host):
+                        url = queues[host].popleft()
+                        token = controller.started(host)
+                        pending[loop.run_in_executor(executor, self._fetch_image, url)] = (host, token, url)
+                    if not queues[host]:
+                        del queues[host]
+                
+                # Wake up for the first finished fetch, or when a paused host may send again
+                wake_in = controller.resume_delay(queues)
+                if pending:
+                    done, _ = await asyncio.wait(pending.keys(), timeout=wake_in,
+                                                 return_when=asyncio.FIRST_COMPLETED)
+                else:
+                    done = set()
+                    await asyncio.sleep(wake_in or 0)
+                if check_cancel and check_cancel():
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    raise Exception("Generation cancelled")
+                for f in done:
+                    host, token, url = pending.pop(f)
+                    path, signal = f.result()
+                    controller.finished(host, token, signal['latency'], signal['throttled'], signal['error'])
+                    if signal['throttled'] and not path:
+                        attempt = throttle_attempts.get(url, 0) + 1
+                        throttle_attempts[url] = attempt
+                        if attempt <= THROTTLE_RETRIES:
+                            # Retried under the host's reduced limit after its pause
+                            controller.pause(host, signal['retry_after'] or THROTTLE_PAUSE * 2 ** (attempt - 1))
+                            queues.setdefault(host, deque()).append(url)
+                            continue
+                    done_count += 1
+                    if budget and path and signal['latency']:
+                        budget.temp_bytes += os.path.getsize(path)
+                    if done_count % 5 == 0 or done_count == len(remote):
+                        perc = start + int((done_count / max(1, len(remote))) * span)
+                        if progress_callback:
+                            progress_callback(perc, f"Fetched {done_count}/{len(remote)} images "
+                                                    f"(concurrency {controller.current_limit()})")
+                        if budget:
+                            reason = budget.pressure(done_count, len(remote))
+                            if reason: await asyncio.to_thread(self._step_down, budget, reason)
+                            budget.check_limits()
+        
+        summary = controller.summary()
+        summary['local'] = local_sources
+        print(f"Image fetch concurrency: {summary}")
+        return summary
+
     async def generate_catalog(self, data: List[List[str]], output_path: str, catalog_type: str = "category",
                                selected_items: Optional[List[str]] = None,
                                progress_callback: Optional[Callable[[int, str], None]] = None,
-                               check_cancel: Optional[Callable[[], bool]] = None):
-        """Speed-optimized PDF Generation"""
-        if progress_callback: progress_callback(5, "Initializing speed-optimized engine...")
-        
-        # Prepare Temp
-        self.temp_dir = tempfile.mkdtemp(prefix='pdf_gen_')
-        self.image_cache = {}
-        
+                               check_cancel: Optional[Callable[[], bool]] = None,
+                               image_cache: Optional[Dict[str, str]] = None,
+                               profiler: Optional[JobProfiler] = None,
+                               preview_pages: Optional[int] = None,
+                               budget: Optional[JobBudget] = None):
+        """Speed-optimized PDF Generation
+
+        When image_cache (URL -> local path) is given, the fetch stage is skipped and
+        the caller keeps ownership of the files it points to. Returns job metrics:
+        'image_fetch' (concurrency and local-source summary), 'budget' when a budget
+        is enforced, and 'cell_cache' hit counts. A started profiler
+        gets a lap recorded at the end of each stage. With preview_pages, only the
+        first preview_pages pages of each section are rendered, with small thumbnails.
+        A budget (only honoured when this call owns its images) is enforced during
+        prefetch and build, stepping image quality down before failing.
+        """
+        owns_temp = image_cache is None
+        self._begin_job()
         try:
-            # 1. PRE-FETCH IMAGES IN PARALLEL
-            unique_urls = set()
-            for row in data[1:]:
-                if len(row) > 3 and str(row[3]).strip().startswith('http'):
-                    unique_urls.add(str(row[3]).strip().split(',')[0].strip())
+            if progress_callback: progress_callback(5, "Initializing speed-optimized engine...")
             
-            if progress_callback: progress_callback(10, f"Fetching {len(unique_urls)} images in parallel...")
+            # Prepare Temp
+            if owns_temp:
+                self.temp_dir = tempfile.mkdtemp(prefix='pdf_gen_')
+                self.image_cache = {}
+            else:
+                self.image_cache = dict(image_cache)
+            if preview_pages:
+                self.image_scale, self.jpeg_quality = PREVIEW_IMAGE_SCALE, PREVIEW_JPEG_QUALITY
+            if not owns_temp:
+                budget = None
+            elif budget and not preview_pages:
+                self.image_scale, self.jpeg_quality = budget.level
+            section_limit = preview_pages * ITEMS_PER_PAGE if preview_pages else None
+            metrics = {}
+            self._fragment_cache = _BoundedCache(FRAGMENT_CACHE_SIZE)
+            self._cell_cache = _BoundedCache(CELL_CACHE_SIZE)
             
-            with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-                futures = {executor.submit(self.fetch_image_sync, url): url for url in unique_urls}
-                done_count = 0
-                for f in concurrent.futures.as_completed(futures):
-                    await asyncio.sleep(0) # Yield to event loop
-                    if check_cancel and check_cancel():
-                        executor.shutdown(wait=False)
-                        raise Exception("Generation cancelled")
-                    done_count += 1
-                    if done_count % 5 == 0 or done_count == len(unique_urls):
-                        perc = 10 + int((done_count / max(1, len(unique_urls))) * 25) # 10-35%
-                        if progress_callback: progress_callback(perc, f"Fetched {done_count}/{len(unique_urls)} images")
-
-            # 2. PREPARE DATA & COUNTS
+            # 1. PREPARE DATA & COUNTS
             if catalog_type == 'author':
                 # Group by Author
                 author_map = {}
@@ -250,27 +543,47 @@ class PDFService:
                         'price': str(row[2]).strip(), 'img_url': str(row[3]).strip(), 'author': auth
                     })
                 sorted_keys = sorted(author_map.keys())
-                total_items = sum(len(items) for items in author_map.values())
+                sections = list(author_map.values())
             else:
                 # Category path
                 cat_data, main_cats = self.analyze_categories(data, selected_items)
                 sorted_main = sorted(list(main_cats))
-                total_items = sum(len(info['products']) for info in cat_data.values())
+                sections = [info['products'] for info in cat_data.values()]
+            total_items = sum(len(items[:section_limit]) for items in sections)
+
+            if profiler: profiler.lap("prepare")
+
+            # 2. PRE-FETCH IMAGES IN PARALLEL
+            if owns_temp:
+                await asyncio.to_thread(get_resolver_chain().refresh)
+                if section_limit:
+                    urls = self.collect_image_sources((p['img_url'], p['sku']) for items in sections
+                                                      for p in items[:section_limit])
+                else:
+                    urls = self.collect_image_urls(data)
+                metrics['image_fetch'] = await self.prefetch_images(urls, progress_callback, check_cancel,
+                                                                    budget=budget)
+            if profiler: profiler.lap("image_fetch")
 
             # 3. BUILD STORY
             doc = SimpleDocTemplate(output_path, pagesize=letter, rightMargin=RIGHT_MARGIN,
                                    leftMargin=LEFT_MARGIN, topMargin=TOP_MARGIN, bottomMargin=BOTTOM_MARGIN)
             story = []
-            story.append(Paragraph("PRODUCT CATALOG", self.custom_styles['title']))
+            title = "PRODUCT CATALOG (PREVIEW)" if preview_pages else "PRODUCT CATALOG"
+            story.append(Paragraph(title, self.custom_styles['title']))
             story.append(Spacer(1, 20))
             
             cur_items = 0
-            def update_progress(inc=1):
+            async def update_progress(inc=1):
                 nonlocal cur_items
                 cur_items += inc
                 if progress_callback:
                     p = 35 + int((cur_items / max(1, total_items)) * 60) # 35-95%
                     progress_callback(p, f"Building pages ({cur_items}/{total_items})")
+                if budget and cur_items % ITEMS_PER_PAGE == 0:
+                    reason = budget.pressure()
+                    if reason: await asyncio.to_thread(self._step_down, budget, reason)
+                    budget.check_limits()
 
             if catalog_type == 'author':
                 story.append(Paragraph(f"Authors ({len(sorted_keys)})", self.styles['Heading2']))
@@ -284,11 +597,11 @@ class PDFService:
                     items = author_map[auth]
                     rows_data = []
                     cur_r = []
-                    for item in items:
+                    for item in items[:section_limit]:
                         await asyncio.sleep(0) # Yield
                         if check_cancel and check_cancel(): raise Exception("Cancelled")
                         cur_r.append(self._create_product_cell(item))
-                        update_progress()
+                        await update_progress()
                         if len(cur_r) == COLS_PER_PAGE:
                             rows_data.append(cur_r); cur_r = []
                     if cur_r:
@@ -316,11 +629,11 @@ class PDFService:
                         
                         rows_data = []
                         cur_r = []
-                        for product in sub_info['products']:
+                        for product in sub_info['products'][:section_limit]:
                             await asyncio.sleep(0) # Yield
                             if check_cancel and check_cancel(): raise Exception("Cancelled")
                             cur_r.append(self._create_product_cell(product))
-                            update_progress()
+                            await update_progress()
                             if len(cur_r) == COLS_PER_PAGE:
                                 rows_data.append(cur_r); cur_r = []
                         if cur_r:
@@ -336,16 +649,151 @@ class PDFService:
                             # Use repeating header for Category
                             self._add_product_table(story, rows_data, header_text=header_txt, header_color=color)
 
+            if profiler: profiler.lap("story")
+
             # 3. BUILD PDF
+            if budget:
+                # Last chance to shrink images before layout reads them
+                reason = budget.pressure(before_layout=True)
+                while reason and await asyncio.to_thread(self._step_down, budget, reason):
+                    reason = budget.pressure()
+                budget.check_limits()
             if progress_callback: progress_callback(95, "Finalizing high-quality PDF...")
             doc.build(story)
+            if profiler: profiler.lap("layout")
+            if PDF_LINEARIZE and not preview_pages:
+                if progress_callback: progress_callback(98, "Optimizing PDF for fast web view...")
+                await asyncio.to_thread(self.optimize_output, output_path)
+                if profiler: profiler.lap("optimize")
+            if budget:
+                budget.check_output(output_path)
+                budget.check_limits()
+                metrics['budget'] = budget.report()
+            metrics['cell_cache'] = {'cells': self._cell_cache.stats(), 'fragments': self._fragment_cache.stats()}
             if progress_callback: progress_callback(100, "Catalog Ready!")
+            return metrics
 
         finally:
             # CLEANUP
+            if owns_temp and self.temp_dir and os.path.exists(self.temp_dir):
+                shutil.rmtree(self.temp_dir)
+            self.image_cache = {}
+            self.image_scale, self.jpeg_quality = IMAGE_SCALE, JPEG_QUALITY
+            self._fragment_cache = _BoundedCache(FRAGMENT_CACHE_SIZE)
+            self._cell_cache = _BoundedCache(CELL_CACHE_SIZE)
+            self._job_running = False
+
+    async def generate_batch(self, jobs: List[Dict], 
+                             progress_callback: Optional[Callable[[int, str], None]] = None,
+                             check_cancel: Optional[Callable[[], bool]] = None,
+                             max_workers: Optional[int] = None,
+                             timings: Optional[Dict[str, float]] = None) -> List[Dict]:
+        """Render several catalogs with one shared image prefetch and parallel PDF builds.
+
+        Each job is a dict with 'data' (already filtered rows), 'output_path',
+        'catalog_type' and 'selected_items'. Returns one result per job with
+        'output_path', 'error' (None on success) and 'seconds' spent rendering.
+        If a timings dict is passed, stage durations are recorded into it.
+        """
+        self._begin_job()
+        try:
+            if progress_callback: progress_callback(5, f"Preparing {len(jobs)} catalogs...")
+            self.temp_dir = tempfile.mkdtemp(prefix='pdf_batch_')
+            self.image_cache = {}
+            
+            # 1. ONE PREFETCH FOR THE UNION OF ALL IMAGES
+            await asyncio.to_thread(get_resolver_chain().refresh)
+            sources = {}
+            for job in jobs:
+                for key, req in self.collect_image_urls(job['data']).items():
+                    sources.setdefault(key, req)
+            stage_start = time.perf_counter()
+            await self.prefetch_images(sources, progress_callback, check_cancel, start=10, span=30)
+            self.get_placeholder_path()
+            shared_cache = dict(self.image_cache)
+            if timings is not None: timings['prefetch'] = time.perf_counter() - stage_start
+            
+            # 2. RENDER EACH CATALOG IN ITS OWN PROCESS
+            if progress_callback: progress_callback(40, f"Rendering {len(jobs)} catalogs in parallel...")
+            loop = asyncio.get_running_loop()
+            workers = max(1, min(max_workers or BATCH_RENDER_WORKERS, len(jobs)))
+            results = [{'output_path': job['output_path'], 'error': None, 'seconds': None} for job in jobs]
+            stage_start = time.perf_counter()
+            
+            # No with-block: its exit would wait on running renders and stall the event loop on cancel
+            executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            try:
+                pending = {
+                    loop.run_in_executor(
+                        executor, _render_catalog_job, job['data'], job['output_path'],
+                        job['catalog_type'], job.get('selected_items'), shared_cache
+                    ): idx
+                    for idx, job in enumerate(jobs)
+                }
+                positions = dict(pending)
+                done_count = 0
+                while pending:
+                    done, _ = await asyncio.wait(pending.keys(), timeout=0.5,
+                                                 return_when=asyncio.FIRST_COMPLETED)
+                    if check_cancel and check_cancel():
+                        for f in pending: f.cancel()
+                        raise Exception("Generation cancelled")
+                    for f in done:
+                        idx = positions[f]
+                        pending.pop(f)
+                        try:
+                            results[idx]['seconds'] = f.result()
+                        except Exception as e:
+                            print(f"Batch render failed for {jobs[idx]['output_path']}: {e}")
+                            results[idx]['error'] = str(e)
+                        done_count += 1
+                        if progress_callback:
+                            perc = 40 + int((done_count / len(jobs)) * 55) # 40-95%
+                            progress_callback(perc, f"Rendered {done_count}/{len(jobs)} catalogs")
+            except BaseException:
+                _terminate_pool(executor)
+                raise
+            executor.shutdown(wait=True)  # Every render has finished
+            
+            if timings is not None: timings['render'] = time.perf_counter() - stage_start
+            if progress_callback: progress_callback(100, "Catalogs Ready!")
+            return results
+        
+        finally:
             if self.temp_dir and os.path.exists(self.temp_dir):
                 shutil.rmtree(self.temp_dir)
             self.image_cache = {}
+            self._job_running = False
+
+    def optimize_output(self, output_path: str) -> bool:
+        """Rewrite the PDF linearized ("fast web view") with object and cross-reference streams.
+
+        Viewers can show page one before the rest of the file arrives. Leaves the
+        file untouched and returns False if pikepdf is unavailable or rewriting fails.
+        """
+        try:
+            import pikepdf
+        except ImportError:
+            print("pikepdf not installed; skipping PDF linearization")
+            return False
+        
+        tmp_path = f"{output_path}.linearized"
+        try:
+            with pikepdf.open(output_path) as pdf:
+                pdf.save(
+                    tmp_path,
+                    linearize=True,
+                    object_stream_mode=pikepdf.ObjectStreamMode.generate,
+                    compress_streams=True,
+                )
+            os.replace(tmp_path, output_path)
+            return True
+        except Exception as e:
+            print(f"PDF linearization failed for {output_path}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
 
     def _add_product_table(self, story, table_data, header_text=None, header_color=None):
         """Helper to add product table with optional repeating header"""
@@ -379,19 +827,54 @@ class PDFService:
         t.setStyle(TableStyle(styles))
         story.append(t)
 
+    def _paragraph(self, text: str, style_name: str) -> Paragraph:
+        """Shared Paragraph for a (text, style) pair from the bounded fragment cache"""
+        key = (text, style_name)
+        para = self._fragment_cache.get(key)
+        if para is None:
+            para = _PrewrappedParagraph(text, self.custom_styles[style_name])
+            self._fragment_cache.put(key, para)
+        return para
+
     def _create_product_cell(self, p):
+        sku_key, img_url = self._image_keys(p.get('img_url', ''), p.get('sku', ''))
+        auth = p.get('author', '')
+        # The same product placed under several categories reuses one set of flowables
+        key = (p.get('sku', '-'), p.get('name', ''), p.get('price', '0'), img_url, auth)
+        cached = self._cell_cache.get(key)
+        if cached is not None:
+            return list(cached)
+
         cell = []
-        img_url = str(p.get('img_url', '')).split(',')[0].strip()
-        path = self.image_cache.get(img_url) if img_url.startswith('http') else None
+        path = self.image_cache.get(sku_key) or self.image_cache.get(img_url)
         if not path or not os.path.exists(path): path = self.get_placeholder_path()
         try:
             cell.append(RLImage(path, width=IMG_WIDTH, height=IMG_HEIGHT))
         except: cell.append(Paragraph("[Img Error]", self.styles['Normal']))
         
         name = self.truncate_text_for_cell(p.get('name', ''), 30)
-        cell.append(Paragraph(name, self.custom_styles['product_name']))
-        cell.append(Paragraph(f"ISBN: {p.get('sku', '-')}", self.custom_styles['isbn']))
-        auth = p.get('author', '')
-        if auth: cell.append(Paragraph(auth[:25], self.custom_styles['author']))
-        cell.append(Paragraph(f"Rs. {p.get('price', '0')} /=", self.custom_styles['price']))
-        return cell
+        cell.append(self._paragraph(name, 'product_name'))
+        cell.append(self._paragraph(f"ISBN: {p.get('sku', '-')}", 'isbn'))
+        if auth: cell.append(self._paragraph(auth[:25], 'author'))
+        cell.append(self._paragraph(f"Rs. {p.get('price', '0')} /=", 'price'))
+        self._cell_cache.put(key, cell)
+        return list(cell)
+
+
+def _terminate_pool(executor: concurrent.futures.ProcessPoolExecutor):
+    """Shut a process pool down without waiting for running renders, killing its workers"""
+    processes = list((getattr(executor, '_processes', None) or {}).values())
+    executor.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+
+
+def _render_catalog_job(data: List[List[str]], output_path: str, catalog_type: str,
+                        selected_items: Optional[List[str]], image_cache: Dict[str, str]) -> float:
+    """Process-pool entry point: build one PDF against an already-fetched image cache"""
+    started = time.perf_counter()
+    service = PDFService()
+    asyncio.run(service.generate_catalog(data, output_path, catalog_type=catalog_type,
+                                         selected_items=selected_items, image_cache=image_cache))
+    return time.perf_counter() - started
@@ -0,0 +1,126 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+
+# Entry points whose cumulative time splits doc.build: (bucket, source path fragments, function).
+# Own time by file can't do this: image embedding spends most of its time in builtins and in
+# reportlab/lib helpers (asciiBase85Encode) that sit outside pdfgen/pdfbase.
+ENTRY_POINTS = [
+    ("doc_build", ("reportlab/platypus/doctemplate", "reportlab\\platypus\\doctemplate"), "build"),
+    ("image_embedding", ("reportlab/pdfgen/canvas", "reportlab\\pdfgen\\canvas"), "drawImage"),
+    ("pdf_write", ("reportlab/pdfgen/canvas", "reportlab\\pdfgen\\canvas"), "save"),
+]
+
+# cProfile hooks are per thread (per interpreter on 3.12+), so profiled jobs run one at a time
+_profile_lock = threading.Lock()
+
+
+class JobProfiler:
+    """
+    Opt-in profiler for a single catalog job
+    
+    Wraps cProfile for per-function statistics and records wall time per stage
+    via lap(). Only jobs that ask for profiling create one, so other jobs run
+    without profiling hooks. start() and stop() must be called on a thread that
+    runs nothing but the profiled job (its own asyncio.run); start() waits until
+    any other profiled job has stopped.
+    """
+    
+    def __init__(self, top_n: int = 30):
+        self.top_n = top_n
+        self.profile = cProfile.Profile()
+        self.stages: Dict[str, float] = {}
+        self.enabled = False
+        self.note: Optional[str] = None
+        self._started = None
+        self._holds_lock = False
+        self._last_lap = None
+    
+    def start(self):
+        _profile_lock.acquire()
+        self._holds_lock = True
+        self._started = self._last_lap = time.perf_counter()
+        try:
+            self.profile.enable()
+            self.enabled = True
+        except ValueError as e:
+            # A profiler outside this module is already active in this interpreter
+            self.note = f"Function profile unavailable: {e}"
+    
+    def stop(self):
+        if self.enabled:
+            self.profile.disable()
+            self.enabled = False
+        if self._holds_lock:
+            self._holds_lock = False
+            _profile_lock.release()
+    
+    def lap(self, stage: str):
+        """Record wall time since the previous lap (or start) under stage"""
+        now = time.perf_counter()
+        self.stages[stage] = self.stages.get(stage, 0.0) + (now - self._last_lap)
+        self._last_lap = now
+    
+    def report(self) -> Dict[str, Any]:
+        """
+        Summarize stage timings, the split of doc.build and the top functions
+        
+        'buckets' splits the layout stage: 'image_embedding' (decoding and
+        encoding covers into the PDF), 'pdf_write' (canvas.save) and 'layout'
+        (the rest of doc.build: wrapping, splitting and drawing flowables).
+        """
+        result: Dict[str, Any] = {
+            "wall_seconds": round(time.perf_counter() - self._started, 4) if self._started else 0.0,
+            "stages": {k: round(v, 4) for k, v in self.stages.items()},
+            "buckets": {},
+            "top_functions": [],
+        }
+        if self.note:
+            result["note"] = self.note
+        
+        try:
+            stats = pstats.Stats(self.profile, stream=io.StringIO())
+        except TypeError:
+            # Nothing was collected
+            return result
+        
+        entry_times: Dict[str, float] = {name: 0.0 for name, _, _ in ENTRY_POINTS}
+        rows: List[Dict[str, Any]] = []
+        for (filename, line, func), (cc, nc, tt, ct, _) in stats.stats.items():
+            for name, fragments, entry_func in ENTRY_POINTS:
+                if func == entry_func and any(f in filename for f in fragments):
+                    # SimpleDocTemplate.build wraps BaseDocTemplate.build: keep the outermost
+                    entry_times[name] = max(entry_times[name], ct)
+            rows.append({
+                "function": f"{os.path.basename(filename)}:{line}({func})",
+                "calls": nc,
+                "own_seconds": round(tt, 4),
+                "cumulative_seconds": round(ct, 4),
+            })
+        
+        rows.sort(key=lambda r: r["cumulative_seconds"], reverse=True)
+        buckets = {
+            "layout": max(0.0, entry_times["doc_build"] - entry_times["image_embedding"] - entry_times["pdf_write"]),
+            "image_embedding": entry_times["image_embedding"],
+            "pdf_write": entry_times["pdf_write"],
+        }
+        result["buckets"] = {k: round(v, 4) for k, v in buckets.items()}
+        result["top_functions"] = rows[:self.top_n]
+        return result
+    
+    def save(self, output_path: str) -> str:
+        """Write <output_path>.profile.json (and .prof for pstats/snakeviz) and return the JSON path"""
+        json_path = f"{output_path}.profile.json"
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+        try:
+            self.profile.dump_stats(f"{output_path}.prof")
+        except TypeError:
+            pass
+        return json_path
@@ -0,0 +1,58 @@
+import bisect
+import hashlib
+import json
+from typing import List, Dict, Any, Tuple
+
+
+class SelectorIndex:
+    """
+    Sorted, searchable view of one selector list (authors or categories)
+    
+    Built once per data version. Prefix search is a binary search over
+    case-folded names; substring search is a scan over the same folded
+    strings without re-deriving them per query.
+    """
+    
+    def __init__(self, items: List[Dict[str, Any]]):
+        self.items = items  # Sorted by name, as produced by SheetsService
+        folded = sorted((item["name"].casefold(), i) for i, item in enumerate(items))
+        self._folded_keys = [key for key, _ in folded]
+        self._folded_positions = [i for _, i in folded]
+        self._folded_by_position = [item["name"].casefold() for item in items]
+    
+    def search(self, query: str = "", match: str = "substring",
+               offset: int = 0, limit: int = 50) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Page of items whose name matches query (case-insensitive)
+        
+        Args:
+            query: Text to match; empty matches everything
+            match: "prefix" or "substring"
+            offset, limit: Page window over the matches
+            
+        Returns:
+            (page of items, total number of matches)
+        """
+        needle = query.casefold().strip()
+        if not needle:
+            return self.items[offset:offset + limit], len(self.items)
+        
+        if match == "prefix":
+            start = bisect.bisect_left(self._folded_keys, needle)
+            end = bisect.bisect_left(self._folded_keys, needle + "\U0010ffff", lo=start)
+            positions = self._folded_positions[start:end]
+            return [self.items[i] for i in positions[offset:offset + limit]], len(positions)
+        
+        positions = [i for i, name in enumerate(self._folded_by_position) if needle in name]
+        return [self.items[i] for i in positions[offset:offset + limit]], len(positions)
+
+
+class SelectorData:
+    """Categories and authors for one data version, with a content-derived version tag"""
+    
+    def __init__(self, selector_data: Dict[str, Any]):
+        self.data = selector_data
+        self.categories = SelectorIndex(selector_data["categories"])
+        self.authors = SelectorIndex(selector_data["authors"])
+        digest = hashlib.sha1(json.dumps(selector_data, sort_keys=True).encode("utf-8"))
+        self.version = digest.hexdigest()[:16]
@@ -1,26 +1,82 @@
 import os
+import csv
 import json
-from typing import List, Dict, Any, Set
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import List, Dict, Any, Set, Optional, AsyncIterator, Deque
 from dotenv import load_dotenv
 
+from services.selector_index import SelectorData
+
 load_dotenv()
 
+# Sheet columns (A:F)
+SKU_COL, NAME_COL, PRICE_COL, IMAGE_COL, AUTHOR_COL, CATEGORY_COL = range(6)
+NUM_COLS = 6
+
+# Chunked fetching: rows per batchGet and chunks in flight at once
+SHEET_CHUNK_ROWS = int(os.getenv("SHEET_CHUNK_ROWS", 5000))
+SHEET_FETCH_CONCURRENCY = int(os.getenv("SHEET_FETCH_CONCURRENCY", 4))
+# "single" fetches A:F in one values().get call; "chunked" uses iter_sheet_rows
+SHEET_FETCH_MODE = os.getenv("SHEET_FETCH_MODE", "single")
+
+# How long selector data (categories/authors) is reused before re-reading the sheet
+DATA_CACHE_SECONDS = float(os.getenv("DATA_CACHE_SECONDS", 300))
+
+MOCK_DATA = [
+    ["Code", "Description", "Image", "Price", "Author", "Category"],
+    ["P001", "Sample Mystery Book", "https://via.placeholder.com/150", "$19.99", "Agatha Christie", "Fiction > Mystery"],
+    ["P002", "Python Programming", "https://via.placeholder.com/150", "$29.99", "Guido van Rossum", "Computers > Programming"],
+    ["P003", "Space Adventure", "https://via.placeholder.com/150", "$15.99", "Isaac Asimov", "Fiction > Sci-Fi"],
+    ["P004", "History of Rome", "https://via.placeholder.com/150", "$24.99", "Mary Beard", "Non-Fiction > History"],
+    ["P005", "Delicious Recipes", "https://via.placeholder.com/150", "$35.00", "Gordon Ramsay", "Cooking"],
+    ["P006", "The Great Gatsby", "https://via.placeholder.com/150", "$12.99", "F. Scott Fitzgerald", "Fiction > Classic"],
+    ["P007", "Quantum Physics", "https://via.placeholder.com/150", "$45.00", "Stephen Hawking", "Science > Physics"],
+    ["P008", "Modern Art", "https://via.placeholder.com/150", "$55.00", "Banksy", "Arts > Modern"],
+]
+
 
 class SheetsService:
-    """Service for interacting with Google Sheets API"""
+    """Service for interacting with Google Sheets API
+    
+    The Google client libraries are imported and the API client is built on
+    first use, so constructing the service is cheap.
+    """
     
     def __init__(self):
         self.spreadsheet_id = os.getenv("SPREADSHEET_ID")
         self.credentials_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS", "credentials.json")
+        # Local export used in place of Google Sheets (offline development, load tests)
+        self.data_file = os.getenv("SHEET_DATA_FILE")
         self.service = None
-        self._initialize_service()
+        self.mock_mode = None  # Resolved by _initialize_service on first use
+        self._init_lock = threading.Lock()
+        self._credentials = None
+        self._thread_local = threading.local()
+        self._selector_cache = None
+        self._selector_cached_at = 0.0
+        self._selector_lock = None
+    
+    def warm_up(self):
+        """Build the API client now instead of on the first request"""
+        if self.mock_mode is None:
+            with self._init_lock:
+                if self.mock_mode is None:
+                    self._initialize_service()
     
     def _initialize_service(self):
         """Initialize Google Sheets API service"""
+        if self.data_file:
+            print(f"Using local sheet data from {self.data_file}.")
+            self.mock_mode = False
+            return
+        
         try:
+            from google.oauth2 import service_account
+            from googleapiclient.discovery import build
+            
             # Check if credentials are provided in an environment variable as a JSON string
             creds_json = os.getenv("GOOGLE_CREDENTIALS_JSON")
             
@@ -44,6 +100,7 @@ class SheetsService:
                 self.mock_mode = True
                 return
 
+            self._credentials = credentials
             self.service = build('sheets', 'v4', credentials=credentials)
             self.mock_mode = False
         except Exception as e:
@@ -60,20 +117,17 @@ class SheetsService:
         Returns:
             List of rows, each row is a list of cell values
         """
+        self.warm_up()
+        if self.data_file:
+            return await asyncio.to_thread(self.get_file_data, self.data_file)
         if self.mock_mode:
             # Return sample data for demonstration
-            return [
-                ["Code", "Description", "Image", "Price", "Author", "Category"],
-                ["P001", "Sample Mystery Book", "https://via.placeholder.com/150", "$19.99", "Agatha Christie", "Fiction > Mystery"],
-                ["P002", "Python Programming", "https://via.placeholder.com/150", "$29.99", "Guido van Rossum", "Computers > Programming"],
-                ["P003", "Space Adventure", "https://via.placeholder.com/150", "$15.99", "Isaac Asimov", "Fiction > Sci-Fi"],
-                ["P004", "History of Rome", "https://via.placeholder.com/150", "$24.99", "Mary Beard", "Non-Fiction > History"],
-                ["P005", "Delicious Recipes", "https://via.placeholder.com/150", "$35.00", "Gordon Ramsay", "Cooking"],
-                ["P006", "The Great Gatsby", "https://via.placeholder.com/150", "$12.99", "F. Scott Fitzgerald", "Fiction > Classic"],
-                ["P007", "Quantum Physics", "https://via.placeholder.com/150", "$45.00", "Stephen Hawking", "Science > Physics"],
-                ["P008", "Modern Art", "https://via.placeholder.com/150", "$55.00", "Banksy", "Arts > Modern"],
-            ]
+            return [list(row) for row in MOCK_DATA]
+        
+        if SHEET_FETCH_MODE == "chunked" and range_name == "A:F":
+            return [row async for row in self.iter_sheet_rows()]
 
+        from googleapiclient.errors import HttpError
         try:
             result = self.service.spreadsheets().values().get(
                 spreadsheetId=self.spreadsheet_id,
@@ -98,6 +152,220 @@ class SheetsService:
             print(f"Error fetching sheet data: {e}")
             raise
     
+    def _thread_http(self):
+        """Authorized HTTP transport for the calling thread (httplib2 is not thread-safe)"""
+        http = getattr(self._thread_local, "http", None)
+        if http is None:
+            import httplib2
+            from google_auth_httplib2 import AuthorizedHttp
+            http = AuthorizedHttp(self._credentials, http=httplib2.Http(timeout=60))
+            self._thread_local.http = http
+        return http
+    
+    def _grid_row_count(self) -> int:
+        """Row count of the first sheet's grid (an upper bound on data rows)"""
+        meta = self.service.spreadsheets().get(
+            spreadsheetId=self.spreadsheet_id,
+            fields="sheets(properties(gridProperties(rowCount)))"
+        ).execute(http=self._thread_http())
+        return meta["sheets"][0]["properties"]["gridProperties"]["rowCount"]
+    
+    def _fetch_chunk(self, start_row: int, end_row: int, column_groups: List[List[int]]) -> List[List[str]]:
+        """
+        Fetch rows start_row..end_row (1-based, inclusive) for the given column groups
+        with one batchGet, merged back into full-width rows
+        """
+        ranges = [
+            f"{chr(ord('A') + group[0])}{start_row}:{chr(ord('A') + group[-1])}{end_row}"
+            for group in column_groups
+        ]
+        result = self.service.spreadsheets().values().batchGet(
+            spreadsheetId=self.spreadsheet_id,
+            ranges=ranges,
+            majorDimension="ROWS"
+        ).execute(http=self._thread_http())
+        
+        rows = [[''] * NUM_COLS for _ in range(end_row - start_row + 1)]
+        for group, value_range in zip(column_groups, result.get('valueRanges', [])):
+            for r, values in enumerate(value_range.get('values', [])):
+                for offset, value in enumerate(values[:len(group)]):
+                    rows[r][group[0] + offset] = value
+        return rows
+    
+    async def iter_sheet_rows(
+        self,
+        columns: Optional[List[int]] = None,
+        chunk_rows: int = SHEET_CHUNK_ROWS,
+        concurrency: int = SHEET_FETCH_CONCURRENCY
+    ) -> AsyncIterator[List[str]]:
+        """
+        Stream sheet rows (header first) in row-range chunks
+        
+        Args:
+            columns: Column indexes to request (default: all of A:F). Other
+                columns come back as empty strings so row shape is unchanged.
+            chunk_rows: Rows per batchGet request
+            concurrency: Chunks fetched at once; memory is bounded by
+                chunk_rows * concurrency rows
+            
+        Yields:
+            Rows padded to 6 columns, in sheet order. Trailing empty rows are
+            dropped, matching get_sheet_data.
+        """
+        self.warm_up()
+        wanted = sorted(set(columns)) if columns else list(range(NUM_COLS))
+        
+        if self.data_file or self.mock_mode:
+            rows = await asyncio.to_thread(self.get_file_data, self.data_file) if self.data_file else MOCK_DATA
+            for row in rows:
+                yield [value if i in wanted else '' for i, value in enumerate(row)]
+            return
+        
+        # Group requested columns into contiguous runs, one range per run
+        column_groups: List[List[int]] = []
+        for col in wanted:
+            if column_groups and column_groups[-1][-1] == col - 1:
+                column_groups[-1].append(col)
+            else:
+                column_groups.append([col])
+        
+        from googleapiclient.errors import HttpError
+        try:
+            row_count = await asyncio.to_thread(self._grid_row_count)
+            starts = iter(range(1, row_count + 1, chunk_rows))
+            in_flight: Deque[asyncio.Task] = deque()
+            
+            def schedule_next():
+                start = next(starts, None)
+                if start is not None:
+                    end = min(start + chunk_rows - 1, row_count)
+                    in_flight.append(asyncio.create_task(
+                        asyncio.to_thread(self._fetch_chunk, start, end, column_groups)
+                    ))
+            
+            for _ in range(max(1, concurrency)):
+                schedule_next()
+            
+            blank_run: List[List[str]] = []
+            try:
+                while in_flight:
+                    rows = await in_flight.popleft()
+                    schedule_next()
+                    for row in rows:
+                        # Hold back empty rows until we know data follows them
+                        if not any(row):
+                            blank_run.append(row)
+                            continue
+                        for blank in blank_run:
+                            yield blank
+                        blank_run = []
+                        yield row
+            finally:
+                for task in in_flight:
+                    task.cancel()
+        
+        except HttpError as e:
+            print(f"Error fetching sheet data: {e}")
+            raise
+    
+    async def get_selector_data(self) -> Dict[str, Any]:
+        """
+        Categories and authors with counts, streamed from only the author and category columns
+        
+        Returns:
+            {"categories": [...], "authors": [...], "total_products": int}
+        """
+        categories_dict: Dict[str, int] = {}
+        authors_dict: Dict[str, int] = {}
+        total = -1  # Exclude header
+        
+        async for row in self.iter_sheet_rows(columns=[AUTHOR_COL, CATEGORY_COL]):
+            total += 1
+            if total == 0:
+                continue
+            for category in [c.strip() for c in str(row[CATEGORY_COL]).split(',')]:
+                if category:
+                    categories_dict[category] = categories_dict.get(category, 0) + 1
+            author = str(row[AUTHOR_COL]).strip()
+            if author:
+                authors_dict[author] = authors_dict.get(author, 0) + 1
+        
+        return {
+            "categories": [{"name": n, "count": c} for n, c in sorted(categories_dict.items())],
+            "authors": [{"name": n, "count": c} for n, c in sorted(authors_dict.items())],
+            "total_products": max(total, 0)
+        }
+    
+    async def get_selector_index(self, refresh: bool = False) -> SelectorData:
+        """
+        Searchable categories/authors, cached for DATA_CACHE_SECONDS
+        
+        Concurrent callers share one sheet read when the cache is stale.
+        """
+        if self._selector_lock is None:
+            self._selector_lock = asyncio.Lock()
+        
+        async with self._selector_lock:
+            age = time.monotonic() - self._selector_cached_at
+            if refresh or self._selector_cache is None or age > DATA_CACHE_SECONDS:
+                self._selector_cache = SelectorData(await self.get_selector_data())
+                self._selector_cached_at = time.monotonic()
+            return self._selector_cache
+    
+    async def get_filtered_data(self, kind: str, selected_items: List[str]) -> List[List[str]]:
+        """
+        Stream the sheet and keep only rows matching the selection
+        
+        Args:
+            kind: "categories" or "authors"
+            selected_items: Names to include
+            
+        Returns:
+            Same rows as filter_by_categories/filter_by_authors on the full sheet,
+            without holding the full sheet in memory
+        """
+        selected = set(selected_items)
+        filtered_data: List[List[str]] = []
+        
+        async for row in self.iter_sheet_rows():
+            if not filtered_data:
+                filtered_data.append(row)  # Header
+            elif kind == "categories":
+                if any(cat.strip() in selected for cat in str(row[CATEGORY_COL]).strip().split(',')):
+                    filtered_data.append(row)
+            elif str(row[AUTHOR_COL]).strip() in selected:
+                filtered_data.append(row)
+        
+        return filtered_data
+    
+    def get_file_data(self, path: str) -> List[List[str]]:
+        """
+        Load sheet-shaped data from a local export instead of Google Sheets
+        
+        Args:
+            path: .csv/.tsv export of the sheet, or .json list of rows
+            
+        Returns:
+            List of rows in the same shape as get_sheet_data
+        """
+        ext = os.path.splitext(path)[1].lower()
+        if ext == ".json":
+            with open(path, encoding="utf-8") as f:
+                values = json.load(f)
+        else:
+            delimiter = "\t" if ext == ".tsv" else ","
+            with open(path, newline="", encoding="utf-8-sig") as f:
+                values = [row for row in csv.reader(f, delimiter=delimiter)]
+        
+        normalized_data = []
+        for row in values:
+            row = [str(cell) for cell in row]
+            if len(row) < 6:
+                row.extend([''] * (6 - len(row)))
+            normalized_data.append(row)
+        
+        return normalized_data
+    
     def extract_categories(self, data: List[List[str]]) -> List[Dict[str, Any]]:
         """
         Extract unique categories from sheet data
@@ -212,3 +480,59 @@ class SheetsService:
                     filtered_data.append(row)
         
         return filtered_data
+    
+    def build_index(self, data: List[List[str]]) -> Dict[str, Dict[str, List[int]]]:
+        """
+        Index sheet rows by category and by author in a single pass
+        
+        Args:
+            data: Full sheet data
+            
+        Returns:
+            {"categories": {name: [row positions]}, "authors": {name: [row positions]}}
+            Row positions refer to `data` and skip the header row
+        """
+        categories: Dict[str, List[int]] = {}
+        authors: Dict[str, List[int]] = {}
+        
+        for i, row in enumerate(data[1:], 1):
+            if len(row) > 5 and row[5]:
+                seen: Set[str] = set()
+                for category in str(row[5]).strip().split(','):
+                    category = category.strip()
+                    if category and category not in seen:
+                        seen.add(category)
+                        categories.setdefault(category, []).append(i)
+            
+            if len(row) > 4 and row[4]:
+                author = str(row[4]).strip()
+                if author:
+                    authors.setdefault(author, []).append(i)
+        
+        return {"categories": categories, "authors": authors}
+    
+    def filter_by_index(
+        self,
+        data: List[List[str]],
+        index: Dict[str, Dict[str, List[int]]],
+        kind: str,
+        selected_items: List[str]
+    ) -> List[List[str]]:
+        """
+        Filter data using a prebuilt index instead of rescanning every row
+        
+        Args:
+            data: Full sheet data the index was built from
+            index: Result of build_index(data)
+            kind: "categories" or "authors"
+            selected_items: Names to include
+            
+        Returns:
+            Same rows, in the same order, as filter_by_categories/filter_by_authors
+        """
+        lookup = index[kind]
+        positions: Set[int] = set()
+        for item in selected_items:
+            positions.update(lookup.get(item, ()))
+        
+        return [data[0]] + [data[i] for i in sorted(positions)]
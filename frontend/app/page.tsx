@@ -5,11 +5,11 @@ import { BookOpen, Users, Download, Sparkles } from 'lucide-react'
 import CategorySelector from '@/components/CategorySelector'
 import AuthorSelector from '@/components/AuthorSelector'
 import DownloadButton from '@/components/DownloadButton'
-import { fetchCategories, fetchAuthors } from '@/lib/api'
+import { fetchAllCategories, searchAuthors } from '@/lib/api'
 
 export default function Home() {
     const [categories, setCategories] = useState<Array<{ name: string; count: number }>>([])
-    const [authors, setAuthors] = useState<Array<{ name: string; count: number }>>([])
+    const [authorCount, setAuthorCount] = useState(0)
     const [selectedCategories, setSelectedCategories] = useState<string[]>([])
     const [selectedAuthors, setSelectedAuthors] = useState<string[]>([])
     const [loading, setLoading] = useState(true)
@@ -21,9 +21,13 @@ export default function Home() {
     const loadData = async () => {
         try {
             setLoading(true)
-            const data = await fetchCategories()
-            setCategories(data.categories)
-            setAuthors(data.authors)
+            // Authors are paged by AuthorSelector; only their total is needed here
+            const [allCategories, authorPage] = await Promise.all([
+                fetchAllCategories(),
+                searchAuthors({ limit: 1 })
+            ])
+            setCategories(allCategories)
+            setAuthorCount(authorPage.total)
         } catch (error) {
             console.error('Error loading data:', error)
         } finally {
@@ -111,7 +115,6 @@ export default function Home() {
                             </div>
                             <div className="p-6">
                                 <AuthorSelector
-                                    authors={authors}
                                     selectedAuthors={selectedAuthors}
                                     onSelectionChange={setSelectedAuthors}
                                 />
@@ -142,7 +145,7 @@ export default function Home() {
                                     <div className="mt-4 flex gap-3 text-[10px] font-bold text-brand-blue/40 uppercase tracking-tighter">
                                         <span>{categories.length} Categories</span>
                                         <span>•</span>
-                                        <span>{authors.length} Authors</span>
+                                        <span>{authorCount} Authors</span>
                                     </div>
                                 </div>
                                 <DownloadButton
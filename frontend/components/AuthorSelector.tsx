@@ -1,30 +1,61 @@
 'use client'
 
-import { useState } from 'react'
+import { useState, useEffect } from 'react'
 import { Search, ChevronDown, ChevronUp } from 'lucide-react'
+import { searchAuthors, AuthorData } from '@/lib/api'
 
-interface Author {
-    name: string
-    count: number
-}
+// Authors are searched and paged on the server instead of loading the full list
+const PAGE_SIZE = 50
+const SEARCH_DELAY_MS = 250
 
 interface AuthorSelectorProps {
-    authors: Author[]
     selectedAuthors: string[]
     onSelectionChange: (selected: string[]) => void
 }
 
 export default function AuthorSelector({
-    authors,
     selectedAuthors,
     onSelectionChange
 }: AuthorSelectorProps) {
     const [searchTerm, setSearchTerm] = useState('')
     const [isExpanded, setIsExpanded] = useState(false)
+    const [filteredAuthors, setFilteredAuthors] = useState<AuthorData[]>([])
+    const [total, setTotal] = useState(0)
+    const [loadingMore, setLoadingMore] = useState(false)
 
-    const filteredAuthors = authors.filter(author =>
-        author.name.toLowerCase().includes(searchTerm.toLowerCase())
-    )
+    useEffect(() => {
+        let cancelled = false
+        const timer = setTimeout(async () => {
+            try {
+                const page = await searchAuthors({ q: searchTerm, match: 'substring', offset: 0, limit: PAGE_SIZE })
+                if (!cancelled) {
+                    setFilteredAuthors(page.items)
+                    setTotal(page.total)
+                }
+            } catch (error) {
+                console.error('Error searching authors:', error)
+            }
+        }, searchTerm ? SEARCH_DELAY_MS : 0)
+        return () => {
+            cancelled = true
+            clearTimeout(timer)
+        }
+    }, [searchTerm])
+
+    const handleLoadMore = async () => {
+        try {
+            setLoadingMore(true)
+            const page = await searchAuthors({
+                q: searchTerm, match: 'substring', offset: filteredAuthors.length, limit: PAGE_SIZE
+            })
+            setFilteredAuthors([...filteredAuthors, ...page.items])
+            setTotal(page.total)
+        } catch (error) {
+            console.error('Error loading authors:', error)
+        } finally {
+            setLoadingMore(false)
+        }
+    }
 
     const handleToggle = (authorName: string) => {
         if (selectedAuthors.includes(authorName)) {
@@ -35,7 +66,9 @@ export default function AuthorSelector({
     }
 
     const handleSelectAll = () => {
-        onSelectionChange(authors.map(a => a.name))
+        // Only the authors on screen; selecting thousands at once is not useful
+        const shown = displayedAuthors.map(a => a.name)
+        onSelectionChange([...selectedAuthors, ...shown.filter(name => !selectedAuthors.includes(name))])
     }
 
     const handleClearAll = () => {
@@ -64,7 +97,7 @@ export default function AuthorSelector({
                     onClick={handleSelectAll}
                     className="flex-1 px-3 py-2 text-[10px] font-black uppercase tracking-widest bg-brand-blue/5 hover:bg-brand-blue/10 text-brand-blue rounded-lg transition-colors border border-brand-blue/10"
                 >
-                    Select All
+                    Select Shown
                 </button>
                 <button
                     onClick={handleClearAll}
@@ -99,6 +132,17 @@ export default function AuthorSelector({
                 ))}
             </div>
 
+            {/* Next page */}
+            {isExpanded && filteredAuthors.length < total && (
+                <button
+                    onClick={handleLoadMore}
+                    disabled={loadingMore}
+                    className="w-full py-2 text-xs font-bold text-brand-blue/40 hover:text-brand-red transition-colors uppercase tracking-widest disabled:opacity-50"
+                >
+                    {loadingMore ? 'Loading...' : `Load More (${total - filteredAuthors.length} left)`}
+                </button>
+            )}
+
             {/* Expand/Collapse */}
             {filteredAuthors.length > 5 && (
                 <button
@@ -113,7 +157,7 @@ export default function AuthorSelector({
                     ) : (
                         <>
                             <ChevronDown className="w-4 h-4" />
-                            View All ({filteredAuthors.length})
+                            View All ({total})
                         </>
                     )}
                 </button>
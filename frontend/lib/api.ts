@@ -21,6 +21,8 @@ export interface SheetData {
 export interface CatalogRequest {
     catalog_type: 'category' | 'author' | 'full'
     selected_items?: string[]
+    profile?: boolean
+    preview?: boolean
 }
 
 export interface CatalogResponse {
@@ -35,6 +37,11 @@ export interface ProgressData {
     status: string
     message: string
     file_path?: string
+    preview?: {
+        status: string
+        filename?: string
+        message?: string
+    }
 }
 
 export const fetchCategories = async (): Promise<SheetData> => {
@@ -47,6 +54,44 @@ export const fetchAuthors = async (): Promise<SheetData> => {
     return response.data.data
 }
 
+export interface SearchPage<T> {
+    items: T[]
+    total: number
+    offset: number
+    limit: number
+    version: string
+}
+
+export interface SearchParams {
+    q?: string
+    match?: 'prefix' | 'substring'
+    offset?: number
+    limit?: number
+}
+
+export const searchAuthors = async (params: SearchParams = {}): Promise<SearchPage<AuthorData>> => {
+    const response = await axios.get(`${API_URL}/api/data/authors`, { params })
+    return response.data.data
+}
+
+export const searchCategories = async (params: SearchParams = {}): Promise<SearchPage<CategoryData>> => {
+    const response = await axios.get(`${API_URL}/api/data/categories`, { params })
+    return response.data.data
+}
+
+// Categories are few enough to load whole, a page at a time
+export const fetchAllCategories = async (): Promise<CategoryData[]> => {
+    const categories: CategoryData[] = []
+    let total = Infinity
+    while (categories.length < total) {
+        const page = await searchCategories({ offset: categories.length, limit: 500 })
+        categories.push(...page.items)
+        total = page.total
+        if (page.items.length === 0) break
+    }
+    return categories
+}
+
 export const generateCatalog = async (request: CatalogRequest): Promise<CatalogResponse> => {
     const response = await axios.post(`${API_URL}/api/catalog/generate`, request)
     return response.data
@@ -0,0 +1,82 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+from services.budget_service import JobBudget, BudgetExceeded, QUALITY_LEVELS, MB
+
+
+def fake_rss(monkeypatch, values):
+    """Make current_rss_bytes return values in turn, repeating the last"""
+    values = list(values)
+    monkeypatch.setattr("services.budget_service.current_rss_bytes",
+                        lambda: values.pop(0) if len(values) > 1 else values[0])
+
+
+def test_degrade_walks_the_quality_ladder_once():
+    budget = JobBudget(max_temp_mb=10)
+    assert budget.level == QUALITY_LEVELS[0]
+
+    for _ in range(len(QUALITY_LEVELS) - 1):
+        assert budget.degrade("temp")
+    assert budget.level == QUALITY_LEVELS[-1]
+    assert budget.degrade("temp") is False
+    assert len(budget.reasons) == len(QUALITY_LEVELS) - 1
+    assert budget.report()["degraded"] is True
+
+
+def test_pressure_projects_temp_bytes_from_progress():
+    budget = JobBudget(max_temp_mb=100)
+    budget.temp_bytes = 20 * MB
+    assert budget.pressure(done=10, total=20) is None      # 40 MB projected
+    assert "temp dir projected at 100 MB" in budget.pressure(done=10, total=50)
+
+
+def test_pressure_checks_output_and_time_budgets():
+    budget = JobBudget(max_output_mb=10)
+    budget.temp_bytes = 9.5 * MB
+    assert budget.pressure().startswith("output projected")
+
+    budget = JobBudget(max_seconds=10)
+    budget._started -= 7
+    assert budget.pressure() is None
+    assert "before layout" in budget.pressure(before_layout=True)
+
+
+def test_pressure_on_memory_growth(monkeypatch):
+    fake_rss(monkeypatch, [100 * MB, 195 * MB])
+    budget = JobBudget(max_rss_mb=100)
+    assert budget.pressure().startswith("memory grew 95 MB")
+    assert budget.report()["peak_rss_growth_mb"] == 95
+
+
+def test_check_limits_raises_once_a_budget_is_exceeded(monkeypatch):
+    budget = JobBudget(max_temp_mb=1)
+    budget.temp_bytes = MB
+    budget.check_limits()
+    budget.temp_bytes = MB + 1
+    with pytest.raises(BudgetExceeded, match="Temp dir"):
+        budget.check_limits()
+
+    budget = JobBudget(max_seconds=5)
+    budget._started -= 6
+    with pytest.raises(BudgetExceeded, match="Time budget"):
+        budget.check_limits()
+
+    fake_rss(monkeypatch, [100 * MB, 250 * MB])
+    budget = JobBudget(max_rss_mb=100)
+    with pytest.raises(BudgetExceeded, match="Memory budget"):
+        budget.check_limits()
+
+
+def test_unmeasurable_rss_disables_memory_budget(monkeypatch, capsys):
+    fake_rss(monkeypatch, [None])
+    budget = JobBudget(max_rss_mb=1, max_temp_mb=10)
+
+    assert "ignoring memory budget" in capsys.readouterr().out
+    assert budget.max_rss_bytes == 0
+    assert budget.pressure() is None
+    budget.check_limits()
+    assert budget.report()["peak_rss_growth_mb"] == 0
@@ -0,0 +1,51 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+from services.delivery_service import parse_range_header, iter_file_range, RangeNotSatisfiable
+
+
+@pytest.mark.parametrize("header, size, expected", [
+    ("bytes=0-0", 100, (0, 0)),
+    ("bytes=10-19", 100, (10, 19)),
+    ("bytes=90-", 100, (90, 99)),
+    ("bytes=50-999", 100, (50, 99)),      # End past EOF is clamped
+    ("bytes=-10", 100, (90, 99)),         # Suffix range
+    ("bytes=-500", 100, (0, 99)),         # Suffix longer than the file
+    ("bytes=10-19, 50-59", 100, (10, 19)),  # Multi-range: first range only
+    ("bytes= 5-6", 100, (5, 6)),
+])
+def test_satisfiable_ranges(header, size, expected):
+    assert parse_range_header(header, size) == expected
+
+
+@pytest.mark.parametrize("header", [None, "", "items=0-10", "bytes=abc", "bytes=1-x", "bytes=-"])
+def test_missing_or_malformed_header_sends_whole_file(header):
+    assert parse_range_header(header, 100) is None
+
+
+@pytest.mark.parametrize("header, size", [
+    ("bytes=100-", 100),   # start == size
+    ("bytes=150-160", 100),
+    ("bytes=20-10", 100),  # start > end
+    ("bytes=-0", 100),     # empty suffix
+    ("bytes=0-", 0),       # empty file
+    ("bytes=-5", 0),
+])
+def test_unsatisfiable_ranges(header, size):
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range_header(header, size)
+
+
+def test_iter_file_range_yields_inclusive_bytes(tmp_path, monkeypatch):
+    path = tmp_path / "catalog.pdf"
+    path.write_bytes(bytes(range(256)) * 4)
+    monkeypatch.setattr("services.delivery_service.CHUNK_SIZE", 100)
+
+    chunks = list(iter_file_range(str(path), 250, 509))
+
+    assert b"".join(chunks) == (bytes(range(256)) * 4)[250:510]
+    assert max(len(c) for c in chunks) == 100
@@ -0,0 +1,122 @@
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+from services.fetch_controller import AdaptiveConcurrency, THROTTLE_BACKOFF, CONGESTION_BACKOFF
+
+HOST = "img.example.com"
+
+
+def controller(**kwargs):
+    params = dict(min_limit=1, max_limit=32, initial_limit=4, total_limit=48)
+    params.update(kwargs)
+    return AdaptiveConcurrency(**params)
+
+
+def round_trip(c, latency=0.1, throttled=False, error=False, host=HOST):
+    token = c.started(host)
+    c.finished(host, token, latency, throttled, error)
+
+
+def test_slow_start_grows_one_slot_per_fast_response():
+    c = controller()
+    for _ in range(3):
+        round_trip(c)
+    assert c.hosts[HOST].limit == 7
+
+
+def test_additive_increase_after_first_congestion_signal():
+    c = controller(initial_limit=8)
+    round_trip(c, throttled=True)
+    limit = c.hosts[HOST].limit
+    assert limit == 8 * THROTTLE_BACKOFF
+
+    round_trip(c)
+    assert c.hosts[HOST].limit == pytest.approx(limit + 1 / limit)
+
+
+def test_throttle_halves_once_per_window():
+    c = controller(initial_limit=16)
+    tokens = [c.started(HOST) for _ in range(5)]
+    # Every request already in flight comes back throttled: one decrease, not five
+    for token in tokens:
+        c.finished(HOST, token, 0.1, throttled=True)
+    assert c.hosts[HOST].limit == 16 * THROTTLE_BACKOFF
+    assert c.hosts[HOST].throttled == 5
+
+    # A request sent after the decrease starts a new window
+    round_trip(c, throttled=True)
+    assert c.hosts[HOST].limit == 16 * THROTTLE_BACKOFF * THROTTLE_BACKOFF
+
+
+def test_errors_back_off_like_throttling():
+    c = controller(initial_limit=8)
+    round_trip(c, error=True)
+    assert c.hosts[HOST].limit == 8 * THROTTLE_BACKOFF
+    assert c.hosts[HOST].errors == 1
+
+
+def test_slow_response_shrinks_limit_slightly():
+    c = controller(initial_limit=10)
+    round_trip(c, latency=0.1)           # Best latency 0.1, limit 11
+    round_trip(c, latency=1.0)           # 10x slower than best
+    assert c.hosts[HOST].limit == pytest.approx(11 * CONGESTION_BACKOFF)
+    assert c.hosts[HOST].slow_start is False
+
+
+def test_fast_host_jitter_is_not_congestion():
+    c = controller(initial_limit=10)
+    round_trip(c, latency=0.007)
+    round_trip(c, latency=0.030)         # 4x best, but only 23 ms slower
+    assert c.hosts[HOST].limit == 12
+    assert c.hosts[HOST].slow_start is True
+
+
+def test_cache_hits_carry_no_signal():
+    c = controller()
+    round_trip(c, latency=0.0)
+    assert c.hosts[HOST].limit == 4
+    assert c.hosts[HOST].best_latency is None
+
+
+def test_limit_stays_within_bounds():
+    c = controller(min_limit=2, max_limit=6, initial_limit=4)
+    for _ in range(10):
+        round_trip(c)
+    assert c.hosts[HOST].limit == 6
+    for _ in range(10):
+        round_trip(c, throttled=True)
+    assert c.hosts[HOST].limit == 2
+
+
+def test_total_limit_caps_all_hosts():
+    c = controller(initial_limit=4, total_limit=5)
+    for _ in range(4):
+        c.started("a.example.com")
+    c.started("b.example.com")
+    assert not c.can_start("b.example.com")
+    assert c.peak_in_flight == 5
+
+
+def test_per_host_limit_blocks_only_that_host():
+    c = controller(initial_limit=2)
+    c.started("a.example.com")
+    c.started("a.example.com")
+    assert not c.can_start("a.example.com")
+    assert c.can_start("b.example.com")
+
+
+def test_pause_holds_host_until_it_expires():
+    c = controller()
+    c.pause(HOST, 0.05)
+    assert not c.can_start(HOST)
+    assert 0 < c.resume_delay([HOST]) <= 0.05
+    assert c.resume_delay(["other.example.com"]) is None
+
+    time.sleep(0.06)
+    assert c.can_start(HOST)
+    assert c.resume_delay([HOST]) is None
@@ -0,0 +1,68 @@
+import asyncio
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+from services.pdf_service import PDFService, THROTTLE_RETRIES
+
+
+class ThrottlingServer:
+    """Answers every GET with 429 and Retry-After, counting requests"""
+
+    def __init__(self, status=429):
+        self.requests = 0
+        server_ref = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server_ref.requests += 1
+                self.send_response(status)
+                self.send_header("Retry-After", "1")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/img/1.png"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture(params=[429, 503])
+def throttling_server(request):
+    server = ThrottlingServer(request.param)
+    yield server
+    server.close()
+
+
+def test_throttled_response_is_reported_after_one_request(throttling_server):
+    path, signal = PDFService()._fetch_image(throttling_server.url)
+
+    assert path is None
+    assert throttling_server.requests == 1
+    assert signal['throttled'] and not signal['error']
+    assert signal['retry_after'] == 1.0
+
+
+def test_prefetch_retries_throttled_urls_through_the_controller(throttling_server, monkeypatch):
+    # Skip the Retry-After pauses; the retry count is what matters here
+    monkeypatch.setattr("services.fetch_controller.AdaptiveConcurrency.pause", lambda self, host, seconds: None)
+    service = PDFService()
+    sources = {throttling_server.url: {'url': throttling_server.url, 'sku': ''}}
+
+    summary = asyncio.run(service.prefetch_images(sources))
+
+    host = summary['hosts']['127.0.0.1:%d' % throttling_server.server.server_address[1]]
+    assert throttling_server.requests == THROTTLE_RETRIES + 1
+    assert host['throttled'] == THROTTLE_RETRIES + 1
+    assert host['final_concurrency'] == 1
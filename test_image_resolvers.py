@@ -0,0 +1,151 @@
+import os
+import sys
+import zipfile
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+from services.image_resolvers import (
+    normalize_sku, SkuIndexResolver, FileUrlResolver, MirrorResolver, ResolverChain,
+)
+
+
+def write(path, data=b"cover"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return path
+
+
+def test_normalize_sku():
+    assert normalize_sku("978-0-14") == "978014"
+    assert normalize_sku(" AB 12/x ") == "ab12x"
+    assert normalize_sku(978014) == "978014"
+
+
+def test_sku_index_matches_normalized_file_stems(tmp_path):
+    covers = tmp_path / "covers"
+    write(covers / "978-0-14.jpg")
+    write(covers / "nested" / "ABC-1.PNG")
+    write(covers / "978999.txt")
+    resolver = SkuIndexResolver([str(covers)])
+
+    found = resolver.resolve_batch({
+        "a": {"url": "", "sku": "978014"},
+        "b": {"url": "", "sku": "abc 1"},
+        "c": {"url": "", "sku": "978999"},
+        "d": {"url": "", "sku": ""},
+    }, None)
+
+    assert found == {"a": str(covers / "978-0-14.jpg"), "b": str(covers / "nested" / "ABC-1.PNG")}
+    assert resolver.has_sku("978-0-14") and not resolver.has_sku("978999")
+
+
+def test_archive_members_are_extracted_into_temp_dir(tmp_path):
+    archive_path = tmp_path / "covers.zip"
+    with zipfile.ZipFile(archive_path, "w") as archive:
+        archive.writestr("scans/978-0-14.jpg", b"first")
+        archive.writestr("scans/978015.png", b"second")
+    temp_dir = tmp_path / "job"
+    temp_dir.mkdir()
+    resolver = SkuIndexResolver([str(archive_path)])
+
+    found = resolver.resolve_batch({
+        "a": {"url": "", "sku": "978014"},
+        "b": {"url": "", "sku": "978-0-15"},
+        "c": {"url": "", "sku": "000"},
+    }, str(temp_dir))
+
+    assert set(found) == {"a", "b"}
+    for key, data, ext in [("a", b"first", ".jpg"), ("b", b"second", ".png")]:
+        assert os.path.dirname(found[key]) == str(temp_dir)
+        assert found[key].endswith(ext)
+        with open(found[key], "rb") as f:
+            assert f.read() == data
+
+
+def test_file_urls_inside_roots_resolve(tmp_path):
+    cover = write(tmp_path / "covers" / "my cover.jpg")
+    resolver = FileUrlResolver([str(tmp_path / "covers")])
+
+    found = resolver.resolve_batch({
+        "a": {"url": "file://" + str(cover).replace(" ", "%20"), "sku": ""},
+        "b": {"url": "file://" + str(tmp_path / "covers" / "missing.jpg"), "sku": ""},
+        "c": {"url": "http://example.com/a.jpg", "sku": ""},
+    }, None)
+
+    assert found == {"a": str(cover)}
+
+
+def test_file_urls_outside_roots_are_ignored(tmp_path, capsys):
+    covers = tmp_path / "covers"
+    write(covers / "ok.jpg")
+    write(tmp_path / "secret.jpg")
+    write(tmp_path / "covers-private" / "x.jpg")   # Shares the root's string prefix
+    resolver = FileUrlResolver([str(covers)])
+
+    found = resolver.resolve_batch({
+        "direct": {"url": f"file://{tmp_path}/secret.jpg", "sku": ""},
+        "dotdot": {"url": f"file://{covers}/../secret.jpg", "sku": ""},
+        "encoded": {"url": f"file://{covers}/%2e%2e/secret.jpg", "sku": ""},
+        "sibling": {"url": f"file://{tmp_path}/covers-private/x.jpg", "sku": ""},
+    }, None)
+
+    assert found == {}
+    assert capsys.readouterr().out.count("outside allowed roots") == 4
+
+
+def test_file_url_symlink_out_of_root_is_ignored(tmp_path):
+    covers = tmp_path / "covers"
+    covers.mkdir()
+    secret = write(tmp_path / "secret.jpg")
+    os.symlink(secret, covers / "link.jpg")
+    resolver = FileUrlResolver([str(covers)])
+
+    assert resolver.resolve_batch({"a": {"url": f"file://{covers}/link.jpg", "sku": ""}}, None) == {}
+
+
+def test_mirror_resolves_by_host_or_bare_key(tmp_path):
+    mirror = tmp_path / "mirror"
+    by_host = write(mirror / "cdn.example.com" / "img" / "1.jpg")
+    bare = write(mirror / "img" / "2.jpg")
+    resolver = MirrorResolver(str(mirror))
+
+    found = resolver.resolve_batch({
+        "a": {"url": "https://cdn.example.com/img/1.jpg?w=200", "sku": ""},
+        "b": {"url": "https://other.example.com/img/2.jpg", "sku": ""},
+        "c": {"url": "https://cdn.example.com/img/3.jpg", "sku": ""},
+        "d": {"url": "https://cdn.example.com/", "sku": ""},
+    }, None)
+
+    assert found == {"a": str(by_host), "b": str(bare)}
+
+
+def test_mirror_paths_escaping_the_root_are_ignored(tmp_path):
+    mirror = tmp_path / "mirror"
+    write(mirror / "img" / "ok.jpg")
+    write(tmp_path / "secret.jpg")
+    write(tmp_path / "mirror2" / "x.jpg")
+    resolver = MirrorResolver(str(mirror))
+
+    found = resolver.resolve_batch({
+        "dotdot": {"url": "https://cdn.example.com/../../secret.jpg", "sku": ""},
+        "encoded": {"url": "https://cdn.example.com/%2e%2e/%2e%2e/secret.jpg", "sku": ""},
+        "sibling": {"url": "https://cdn.example.com/%2e%2e/mirror2/x.jpg", "sku": ""},
+        "absolute": {"url": f"https://cdn.example.com/{tmp_path}/secret.jpg", "sku": ""},
+    }, None)
+
+    assert found == {}
+
+
+def test_chain_tries_resolvers_in_order(tmp_path):
+    covers = tmp_path / "covers"
+    by_sku = write(covers / "978014.jpg")
+    by_url = write(covers / "other.jpg")
+    chain = ResolverChain([SkuIndexResolver([str(covers)]), FileUrlResolver([str(covers)])])
+
+    found = chain.resolve_batch({
+        "a": {"url": f"file://{by_url}", "sku": "978-0-14"},
+        "b": {"url": f"file://{by_url}", "sku": "unknown"},
+    }, None)
+
+    assert found == {"a": (str(by_sku), "sku_index"), "b": (str(by_url), "file_url")}
+    assert chain.has_sku("978014") and not chain.has_sku("unknown")
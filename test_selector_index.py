@@ -0,0 +1,75 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+from services.selector_index import SelectorIndex, SelectorData
+
+
+AUTHORS = [{"name": n, "count": i + 1} for i, n in enumerate(sorted([
+    "Agatha Christie", "agnes Smith", "Alan Turing", "Ali Smith", "Ann", "Anne Rice",
+    "Annie Ernaux", "Ben Okri", "Émile Zola", "Zadie Smith",
+]))]
+
+
+def names(items):
+    return [item["name"] for item in items]
+
+
+def test_empty_query_pages_everything():
+    index = SelectorIndex(AUTHORS)
+    items, total = index.search("", offset=2, limit=3)
+    assert total == len(AUTHORS)
+    assert items == AUTHORS[2:5]
+
+
+def test_prefix_is_case_insensitive_and_bounded():
+    index = SelectorIndex(AUTHORS)
+    items, total = index.search("ag", match="prefix")
+    assert sorted(names(items)) == ["Agatha Christie", "agnes Smith"]
+    assert total == 2
+
+    # The upper bound takes every name that extends the prefix and nothing after it
+    items, total = index.search("ann", match="prefix")
+    assert sorted(names(items)) == ["Ann", "Anne Rice", "Annie Ernaux"]
+    assert total == 3
+
+
+def test_prefix_with_no_match_or_past_the_end():
+    index = SelectorIndex(AUTHORS)
+    assert index.search("aa", match="prefix") == ([], 0)
+    assert index.search("zz", match="prefix") == ([], 0)
+    assert index.search("zadie smith and more", match="prefix") == ([], 0)
+
+
+def test_prefix_handles_non_ascii_names():
+    index = SelectorIndex(AUTHORS)
+    items, total = index.search("ÉMILE", match="prefix")
+    assert names(items) == ["Émile Zola"] and total == 1
+
+
+def test_substring_matches_anywhere():
+    index = SelectorIndex(AUTHORS)
+    items, total = index.search("SMITH")
+    assert names(items) == ["Ali Smith", "Zadie Smith", "agnes Smith"]
+    assert total == 3
+
+
+def test_paging_reports_total_of_all_matches():
+    index = SelectorIndex(AUTHORS)
+    first, total = index.search("a", match="prefix", offset=0, limit=2)
+    rest, total_again = index.search("a", match="prefix", offset=2, limit=10)
+    past_end, total_past = index.search("a", match="prefix", offset=50, limit=10)
+
+    assert total == total_again == total_past == 7
+    assert len(first) == 2 and len(rest) == 5 and past_end == []
+    assert not set(names(first)) & set(names(rest))
+
+
+def test_version_tracks_content():
+    data = {"categories": [{"name": "Fiction", "count": 2}], "authors": AUTHORS, "total_products": 2}
+    same = SelectorData(dict(data))
+    changed = SelectorData({**data, "categories": [{"name": "Fiction", "count": 3}]})
+
+    assert SelectorData(data).version == same.version
+    assert SelectorData(data).version != changed.version
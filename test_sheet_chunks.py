@@ -0,0 +1,115 @@
+import asyncio
+import os
+import re
+import sys
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+from services.sheets_service import SheetsService
+
+
+class FakeSheetsAPI:
+    """Answers batchGet for A1 ranges like "B3:C7" from an in-memory grid, trimming
+    trailing empty cells and rows the way the Sheets API does"""
+
+    def __init__(self, grid):
+        self.grid = grid
+        self.requests = []
+
+    def spreadsheets(self):
+        return self
+
+    def values(self):
+        return self
+
+    def batchGet(self, spreadsheetId, ranges, majorDimension):
+        self.requests.append(list(ranges))
+        self._ranges = ranges
+        return self
+
+    def execute(self, http=None):
+        value_ranges = []
+        for rng in self._ranges:
+            first_col, first_row, last_col, last_row = re.match(r"([A-Z])(\d+):([A-Z])(\d+)", rng).groups()
+            cols = range(ord(first_col) - ord('A'), ord(last_col) - ord('A') + 1)
+            values = []
+            for r in range(int(first_row) - 1, int(last_row)):
+                row = self.grid[r] if r < len(self.grid) else []
+                cells = [row[c] if c < len(row) else '' for c in cols]
+                while cells and cells[-1] == '':
+                    cells.pop()
+                values.append(cells)
+            while values and not values[-1]:
+                values.pop()
+            value_ranges.append({'range': rng, 'values': values})
+        return {'valueRanges': value_ranges}
+
+
+def make_service(grid, row_count=None):
+    service = SheetsService()
+    service.data_file = None
+    service.mock_mode = False
+    service.service = FakeSheetsAPI(grid)
+    service._thread_http = lambda: None
+    service._grid_row_count = lambda: row_count if row_count is not None else len(grid)
+    return service
+
+
+def collect(service, **kwargs):
+    async def run():
+        return [row async for row in service.iter_sheet_rows(**kwargs)]
+    return asyncio.run(run())
+
+
+GRID = [
+    ["Code", "Description", "Price", "Image", "Author", "Category"],
+    ["P1", "Book 1", "100", "http://img/1", "Author A", "Fiction"],
+    ["P2", "Book 2", "200", "", "Author B", "Cooking"],
+    ["P3", "Book 3", "300", "http://img/3", "", "Arts > Modern"],
+]
+
+
+def test_fetch_chunk_merges_column_groups_into_full_rows():
+    service = make_service(GRID)
+    rows = service._fetch_chunk(1, 4, [[0], [4, 5]])
+
+    assert service.service.requests == [["A1:A4", "E1:F4"]]
+    assert rows[1] == ["P1", "", "", "", "Author A", "Fiction"]
+    # Trailing empty cells the API omits come back as ''
+    assert rows[3] == ["P3", "", "", "", "", "Arts > Modern"]
+
+
+def test_fetch_chunk_pads_rows_missing_from_the_response():
+    service = make_service(GRID)
+    rows = service._fetch_chunk(3, 6, [[0, 1, 2, 3, 4, 5]])
+
+    assert len(rows) == 4
+    assert rows[0] == GRID[2]
+    assert rows[2] == rows[3] == [''] * 6
+
+
+def test_iter_sheet_rows_keeps_shape_with_projected_columns():
+    rows = collect(make_service(GRID), columns=[4, 5], chunk_rows=2, concurrency=2)
+
+    assert len(rows) == len(GRID)
+    assert all(len(row) == 6 for row in rows)
+    assert [row[4] for row in rows] == [row[4] for row in GRID]
+    assert all(row[0] == '' for row in rows)
+
+
+def test_iter_sheet_rows_holds_back_blank_rows_until_data_follows():
+    blank = [''] * 6
+    grid = [GRID[0], GRID[1], blank, blank, GRID[2], blank, blank]
+    # Blank rows spanning a chunk boundary are kept between data rows, trailing ones dropped
+    rows = collect(make_service(grid, row_count=10), chunk_rows=3, concurrency=2)
+
+    assert rows == [GRID[0], GRID[1], blank, blank, GRID[2]]
+
+
+def test_iter_sheet_rows_matches_single_fetch_order_across_chunks():
+    grid = [GRID[0]] + [[f"P{i}", f"Book {i}", "1", "", "A", "C"] for i in range(1, 24)]
+    rows = collect(make_service(grid), chunk_rows=5, concurrency=3)
+
+    assert rows == grid